@@ -1,12 +1,16 @@
 from __future__ import annotations
-from time import sleep
-import time
 import threading
-from observatory.errors import StateError
+import time
+from alpaquero.metrics import PollMetrics
 
-from typing import Callable, Generic, TypeVar
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Generic, Iterator, TypeVar
 import traceback
 
+if TYPE_CHECKING:
+    from alpaquero.scheduler import AlpaqueroScheduler
+    from alpaquero.breaker import HostCircuitBreaker
+
 TAlpaca = TypeVar("TAlpaca")
 
 class Alpaquero(Generic[TAlpaca]):
@@ -16,7 +20,11 @@ class Alpaquero(Generic[TAlpaca]):
             updater,
             on_destroy: Callable[[], None] | None = None,
             poll_time: float = 1,
-            name: str = "alpaca"
+            name: str = "alpaca",
+            scheduler: "AlpaqueroScheduler | None" = None,
+            fast_poll_time: float | None = None,
+            idle_poll_time: float | None = None,
+            breaker: "HostCircuitBreaker | None" = None,
         ):
         self._alpaca: TAlpaca | None = None
         self._factory = factory
@@ -25,11 +33,36 @@ class Alpaquero(Generic[TAlpaca]):
         self._backoff = 1
         self._max_backoff = 60
         self._poll_time = poll_time
+        # adaptive polling: fast while the device reports motion, slow when idle
+        self._fast_poll_time = fast_poll_time if fast_poll_time is not None else poll_time
+        self._idle_poll_time = idle_poll_time if idle_poll_time is not None else poll_time
+        self._is_active: Callable[[], bool] | None = None
+        # callers waiting on polled state, see polling_fast()
+        self._fast_holds = 0
+        self._healthy = False
         self.name = name
+        self.metrics = PollMetrics()
 
+        # shared with every device on the same host; while it is open this
+        # device skips its steps and is woken when the host recovers
+        self._breaker = breaker
+
+        # when a scheduler is given the device is polled from the shared
+        # asyncio engine instead of a dedicated thread
+        self._scheduler = scheduler
         self._stop = threading.Event()
+        # set to cut the idle wait short, either to stop or to poll right away
+        self._wake = threading.Event()
         self._thread = None
 
+        # completed steps, so callers can wait for a poll that started after them
+        self._step_done = threading.Condition()
+        self._steps = 0
+        self._in_step = False
+        # thread engine: jobs from submit_background, run after the current step
+        self._background: list[Callable[[], Any]] = []
+        self._background_lock = threading.Lock()
+
     @property
     def alpaca(self) -> TAlpaca:
         if self._alpaca is None:
@@ -37,23 +70,44 @@ class Alpaquero(Generic[TAlpaca]):
         return self._alpaca
 
     def create(self):
-        if self._thread and self._thread.is_alive():
+        if self.is_running():
             return self._alpaca
-        
+
+        # a step of the previous run may still be finishing after destroy();
+        # let it land and see its stop flag before this run writes state
+        with self._step_done:
+            self._step_done.wait_for(lambda: not self._in_step, timeout=30)
+
+        # a fresh event per run: a thread still finishing a step after
+        # destroy() keeps seeing its own stop flag
+        self._stop = threading.Event()
+        self._wake.clear()
+        if self._breaker is not None:
+            self._breaker.subscribe(self.request_refresh)
         try:
             self._alpaca = self._factory()
         except Exception as e:
             print("Error creating Alpaca device:", e)
             self._alpaca = None
-        self._stop.clear()
-        self._thread = threading.Thread(target=self._run, name=f"Alpaquero-{self.name}", daemon=True)
+        if self._scheduler is not None:
+            # polling, and reconnecting if that failed, continue on the scheduler
+            self._scheduler.add(self)
+            return self._alpaca
+
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name=f"Alpaquero-{self.name}", daemon=True)
         self._thread.start()
         return self._alpaca
-    
-    def destroy(self, join_timeout: float = 2):
+
+    def destroy(self, join_timeout: float = 0):
+        """Stop polling right away; an in-flight step is abandoned, not waited for."""
         self._stop.set()
+        self._wake.set()
+        if self._breaker is not None:
+            self._breaker.unsubscribe(self.request_refresh)
+        if self._scheduler is not None:
+            self._scheduler.remove(self)
         t = self._thread
-        if t and t.is_alive():
+        if t and t.is_alive() and join_timeout > 0:
             t.join(timeout=join_timeout)
         try:
             if self._alpaca:
@@ -68,6 +122,69 @@ class Alpaquero(Generic[TAlpaca]):
     def set_on_destroy(self, callback: Callable[[], None] | None):
         self._on_destroy = callback
 
+    def set_activity_probe(self, probe: Callable[[], bool] | None):
+        self._is_active = probe
+
+    @contextmanager
+    def polling_fast(self) -> Iterator[None]:
+        """Poll at the fast interval while the block runs, whatever the device reports."""
+        with self._step_done:
+            self._fast_holds += 1
+        try:
+            yield
+        finally:
+            with self._step_done:
+                self._fast_holds -= 1
+
+    def request_refresh(self) -> int:
+        """Poll as soon as possible instead of at the next scheduled tick.
+
+        Returns a step count for wait_for_update(); a step already running when
+        this is called does not count, since it may have read stale values.
+        """
+        with self._step_done:
+            after = self._steps + (1 if self._in_step else 0)
+        if self._scheduler is not None:
+            if self._scheduler.is_registered(self):
+                self._scheduler.add(self)
+        else:
+            self._wake.set()
+        return after
+
+    def submit_background(self, job: Callable[[], Any]):
+        """Run ``job`` outside the polling step without a thread of its own.
+
+        With a scheduler it goes to the scheduler's bounded connect pool;
+        with the thread engine it runs on this device's polling thread once
+        the current step is done.
+        """
+        if self._scheduler is not None:
+            self._scheduler.submit_background(job)
+            return
+        with self._background_lock:
+            self._background.append(job)
+
+    def wait_for_update(self, after: int, timeout: float | None = None) -> bool:
+        """Block until a step completes past ``after``; False on timeout or stop."""
+        with self._step_done:
+            self._step_done.wait_for(lambda: self._steps > after or self._stop.is_set(), timeout)
+            return self._steps > after
+
+    def steps(self) -> int:
+        with self._step_done:
+            return self._steps
+
+    def _current_poll_time(self) -> float:
+        if self._fast_holds:
+            return self._fast_poll_time
+        if self._is_active is None:
+            return self._poll_time
+        try:
+            active = self._is_active()
+        except Exception:
+            return self._poll_time
+        return self._fast_poll_time if active else self._idle_poll_time
+
     def _notify_destroyed(self):
         if self._on_destroy is None:
             return
@@ -76,53 +193,146 @@ class Alpaquero(Generic[TAlpaca]):
         except Exception as e:
             print(f"Error running {self.name} destroy callback:", e)
 
-    def _run(self):
-        healthy = False
-        while not self._stop.is_set():
+    def _run(self, stop: threading.Event):
+        while not stop.is_set():
+            delay = self._step(stop)
+            self._run_background()
+            if stop.is_set():
+                break
+            self._sleep_coop(delay)
+
+    def _run_background(self):
+        with self._background_lock:
+            jobs, self._background = self._background, []
+        for job in jobs:
             try:
-                if self._alpaca is None:
-                    self.reconnect()
-                    if self._alpaca is None:
-                        backoff = min(self._backoff * 2, self._max_backoff)
-                        self._sleep_coop(backoff)
-                        continue
-                    backoff = 1
-                
-                self._updater()
-                if not healthy:
-                    healthy = True
-                    self._backoff = 1
-
-                self._sleep_coop(self._poll_time)
-            
-            except StateError as e:
-                print("Error state reported in updater:", e)
-                self._sleep_coop(self._poll_time)
+                job()
             except Exception as e:
-                print(f"Error in Alpaca updater: {e}")
-                traceback.print_exc()
-                self._notify_destroyed()
-                self._alpaca = None
-                healthy = False
-                self._sleep_coop(self._backoff)
-                self._backoff = min(self._backoff * 2, self._max_backoff)
+                print(f"Error in {self.name} background job:", e)
+
+    def _step(self, stop: threading.Event) -> float:
+        """Run one connect-or-update cycle of the run owning ``stop`` and return the delay until the next one."""
+        if self._breaker is not None and not stop.is_set() and not self._breaker.allow():
+            # nothing is read while the host is down, so this is not a
+            # completed step and wait_for_update() keeps waiting
+            return max(self._breaker.retry_in(), 0.1)
+        with self._step_done:
+            self._in_step = True
+        try:
+            return self._run_step(stop)
+        finally:
+            with self._step_done:
+                self._in_step = False
+                self._steps += 1
+                self._step_done.notify_all()
+
+    def _run_step(self, stop: threading.Event) -> float:
+        # imported here: the observatory package imports this module while it
+        # initialises, so a top-level import would make the two circular
+        from observatory.errors import StateError
+
+        if stop.is_set():
+            return self._poll_time
+        try:
+            if self._alpaca is None:
+                self.reconnect(stop)
+                if self._alpaca is None:
+                    self._backoff = min(self._backoff * 2, self._max_backoff)
+                    return self._backoff
+
+            start = time.perf_counter()
+            self._updater()
+            if stop.is_set():
+                # destroyed while the updater ran: its writes (connected=True
+                # among them) may have landed after destroy() marked the device
+                # disconnected, so mark it again unless a new run owns it now
+                if self._stop is stop:
+                    self._notify_destroyed()
+                return self._poll_time
+            self.metrics.record_tick(time.perf_counter() - start)
+            if not self._healthy:
+                self._healthy = True
+                self._backoff = 1
+
+            return self._current_poll_time()
+
+        except StateError as e:
+            print("Error state reported in updater:", e)
+            self.metrics.record_error(e, state_error=True)
+            return self._current_poll_time()
+        except Exception as e:
+            if stop.is_set():
+                # a failure of an abandoned step; _alpaca and the device state
+                # belong to destroy() or to a newer run by now
+                return self._poll_time
+            print(f"Error in Alpaca updater: {e}")
+            self.metrics.record_error(e)
+            traceback.print_exc()
+            self._notify_destroyed()
+            self._alpaca = None
+            self._healthy = False
+            delay = self._backoff
+            self._backoff = min(self._backoff * 2, self._max_backoff)
+            return delay
 
     def is_running(self) -> bool:
+        if self._scheduler is not None:
+            return self._scheduler.is_registered(self)
         return bool(self._thread and self._thread.is_alive())
 
-    def reconnect(self):
+    def reconnect(self, stop: threading.Event | None = None):
+        stop = stop or self._stop
         try:
-            self._alpaca = self._factory()
+            alpaca = self._factory()
+            if stop.is_set():
+                # destroyed while the factory was connecting
+                if alpaca:
+                    alpaca.Connected = False
+                return
+            self._alpaca = alpaca
             if self._alpaca:
                 print(f"Reconnected to {self.name} Alpaca device")
+            self.metrics.record_reconnect(bool(self._alpaca))
         except Exception as e:
             print(f"Error reconnecting to {self.name} Alpaca device:", e)
+            self.metrics.record_reconnect(False)
             self._alpaca = None
 
+    def metrics_snapshot(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            **self.health(),
+            **self.metrics.to_dict(),
+        }
+
+    def health(self) -> dict[str, Any]:
+        """Compact polling health: status plus the numbers needed to explain it."""
+        poll_time = self._current_poll_time()
+        summary = self.metrics.summary()
+        last_success = summary["last_success"]
+        age = time.time() - last_success if last_success is not None else None
+
+        if not self.is_running():
+            status = "stopped"
+        elif self._alpaca is None:
+            status = "down"
+        elif age is None or age > 3 * poll_time + 5:
+            status = "stale"
+        else:
+            status = "ok"
+
+        if status != "stopped" and self._breaker is not None and self._breaker.state != self._breaker.CLOSED:
+            status = "host_down"
+
+        return {
+            "status": status,
+            "poll_time": poll_time,
+            "backoff": None if self._healthy else self._backoff,
+            "last_success_age": age,
+            **summary,
+        }
+
     def _sleep_coop(self, duration: float):
-        end = time.monotonic() + duration
-        while not self._stop.is_set():
-            remaining = end - time.monotonic()
-            if remaining <= 0:
-                return
-            sleep(min(0.2, remaining))
+        # wakes early only when destroy() or request_refresh() sets the event
+        self._wake.wait(duration)
+        self._wake.clear()
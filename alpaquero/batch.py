@@ -0,0 +1,162 @@
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+import itertools
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from alpaca.device import Device
+from alpaca.camera import raise_alpaca_if
+from alpaca.exceptions import AlpacaRequestException, NotImplementedException, ValueNotSetException
+
+from alpaquero.transport import request_timeout
+
+if TYPE_CHECKING:
+    from alpaquero.capabilities import DeviceCapabilities
+    from alpaquero.metrics import PollMetrics
+
+# alpyca serialises every request behind a class-wide lock, so concurrent reads
+# go through alpaca_get with our own transaction ids instead of Device._get
+_transaction_ids = itertools.count(1)
+
+_read_pool: ThreadPoolExecutor | None = None
+_read_pool_workers = 16
+_read_pool_lock = threading.Lock()
+
+
+def configure_read_pool(max_workers: int):
+    global _read_pool_workers
+    _read_pool_workers = max_workers
+
+
+def _get_read_pool() -> ThreadPoolExecutor:
+    global _read_pool
+    with _read_pool_lock:
+        if _read_pool is None:
+            _read_pool = ThreadPoolExecutor(max_workers=_read_pool_workers, thread_name_prefix="alpaca-read")
+        return _read_pool
+
+
+def request_params(**params) -> dict[str, Any]:
+    """Query parameters for one Alpaca request, with a fresh transaction id."""
+    return {
+        "ClientTransactionID": f"{next(_transaction_ids)}",
+        "ClientID": f"{Device._client_id}",
+        **params,
+    }
+
+
+def alpaca_get(device: Device, attribute: str, timeout: float | None = None, **params) -> Any:
+    """GET a single Alpaca property on the device's own session.
+
+    Without ``timeout`` the transport's read timeout applies.
+    """
+    if timeout is None:
+        timeout = getattr(device.rqs, "read_timeout", 5.0)
+    else:
+        timeout = request_timeout(device.rqs, timeout)
+    pdata = request_params(**params)
+    response = device.rqs.get(f"{device.base_url}/{attribute.lower()}", params=pdata, timeout=timeout)
+    if response.status_code not in range(200, 204):
+        raise AlpacaRequestException(response.status_code, f"{response.text} (URL {response.url})")
+    j = response.json()
+    raise_alpaca_if(j["ErrorNumber"], j["ErrorMessage"])
+    return j["Value"]
+
+
+def _timed_get(device: Device, read: "PropertyRead", metrics: "PollMetrics") -> Any:
+    start = time.perf_counter()
+    ok = False
+    try:
+        value = alpaca_get(device, read.attribute, **read.params)
+        ok = True
+        return value
+    finally:
+        metrics.record_property(read.attribute, time.perf_counter() - start, ok)
+
+
+@dataclass(frozen=True)
+class PropertyRead:
+    key: str
+    attribute: str
+    params: dict[str, Any] = field(default_factory=dict)
+    optional: bool = False
+
+
+@dataclass
+class BatchResult:
+    values: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+    def raise_for(self, key: str):
+        if key in self.errors:
+            raise self.errors[key]
+
+    def report(self, device_name: str):
+        if self.errors:
+            failed = ", ".join(f"{k} ({e})" for k, e in self.errors.items())
+            print(f"Error reading {device_name} properties: {failed}")
+
+
+class PropertyBatch:
+    """A device's declared property reads, fetched concurrently each tick.
+
+    At most ``max_concurrency`` requests are in flight per fetch so a single
+    device cannot monopolise the shared read pool. Failures are collected per
+    key; optional properties the driver does not implement (or has no value
+    for yet) are dropped quietly.
+    """
+
+    def __init__(self, *reads: PropertyRead, max_concurrency: int = 8):
+        self.reads = list(reads)
+        self.max_concurrency = max_concurrency
+
+    @classmethod
+    def of(cls, properties: dict[str, str], optional: tuple[str, ...] = (), max_concurrency: int = 8) -> "PropertyBatch":
+        return cls(
+            *(PropertyRead(key, attribute, optional=key in optional) for key, attribute in properties.items()),
+            max_concurrency=max_concurrency,
+        )
+
+    def fetch(
+            self,
+            device: Device,
+            capabilities: "DeviceCapabilities | None" = None,
+            metrics: "PollMetrics | None" = None,
+        ) -> BatchResult:
+        reads = self.reads
+        if capabilities is not None:
+            reads = [read for read in reads if capabilities.supports(read.attribute)]
+        result = BatchResult()
+        pool = _get_read_pool()
+        pending = iter(reads)
+        in_flight: dict[Future, PropertyRead] = {}
+
+        def submit_next():
+            read = next(pending, None)
+            if read is None:
+                return
+            if metrics is None:
+                future = pool.submit(alpaca_get, device, read.attribute, **read.params)
+            else:
+                future = pool.submit(_timed_get, device, read, metrics)
+            in_flight[future] = read
+
+        for _ in range(self.max_concurrency):
+            submit_next()
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                read = in_flight.pop(future)
+                try:
+                    result.values[read.key] = future.result()
+                except (NotImplementedException, ValueNotSetException) as e:
+                    if not read.optional:
+                        result.errors[read.key] = e
+                except Exception as e:
+                    result.errors[read.key] = e
+                submit_next()
+
+        return result
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Callable
+
+
+class HostCircuitBreaker:
+    """Circuit breaker shared by every device on one Alpaca server (host:port).
+
+    The transport reports each request's outcome. After ``failure_threshold``
+    consecutive connection-level failures the breaker opens and Alpaqueros on
+    the host stop polling. Once ``reset_timeout`` has passed, a single caller
+    is let through as the probe. If the probe succeeds the breaker closes and
+    every subscriber is asked to poll straight away, so the whole group
+    reconnects together. If it fails the breaker reopens with a doubled
+    timeout, capped at ``max_reset_timeout``.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, address: str, failure_threshold: int = 5, reset_timeout: float = 2.0, max_reset_timeout: float = 10.0):
+        self.address = address
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._current_timeout = reset_timeout
+        self._retry_at = 0.0
+        self._opened = 0
+        self._rejected = 0
+        self._subscribers: list[Callable[[], Any]] = []
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def subscribe(self, callback: Callable[[], Any]):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[], Any]):
+        with self._lock:
+            try:
+                self._subscribers.remove(callback)
+            except ValueError:
+                pass
+
+    def allow(self) -> bool:
+        """Whether the caller may talk to the host now; at most one probe while open."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if now >= self._retry_at:
+                # first caller after the timeout becomes the probe; a probe
+                # that never reports back is replaced after another timeout
+                self._state = self.HALF_OPEN
+                self._retry_at = now + self._current_timeout
+                return True
+            self._rejected += 1
+            return False
+
+    def retry_in(self) -> float:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return 0.0
+            return max(self._retry_at - time.monotonic(), 0.0)
+
+    def record_success(self):
+        with self._lock:
+            recovered = self._state != self.CLOSED
+            self._state = self.CLOSED
+            self._failures = 0
+            self._current_timeout = self.reset_timeout
+            subscribers = list(self._subscribers) if recovered else []
+        if recovered:
+            print(f"Alpaca server {self.address} is reachable again")
+        for callback in subscribers:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error notifying {self.address} breaker subscriber:", e)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN:
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+            elif self._state == self.OPEN or self._failures < self.failure_threshold:
+                return
+            else:
+                self._opened += 1
+                print(f"Alpaca server {self.address} unreachable, pausing its devices for {self._current_timeout:g}s")
+            self._state = self.OPEN
+            self._retry_at = time.monotonic() + self._current_timeout
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in": max(self._retry_at - time.monotonic(), 0.0) if self._state != self.CLOSED else 0.0,
+                "times_opened": self._opened,
+                "rejected": self._rejected,
+            }
@@ -0,0 +1,45 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+from alpaca.device import Device
+from alpaca.exceptions import NotImplementedException
+
+from alpaquero.batch import PropertyBatch, PropertyRead
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """What a connected device supports, read once when the factory connects it.
+
+    ``supported`` only covers the properties that were probed; anything else is
+    assumed to be available. ``static`` holds values that cannot change while
+    the device stays connected (sensor geometry, filter names, switch count).
+    """
+    supported: dict[str, bool] = field(default_factory=dict)
+    static: dict[str, Any] = field(default_factory=dict)
+
+    def supports(self, attribute: str) -> bool:
+        return self.supported.get(attribute, True)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.static.get(key, default)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"supported": dict(self.supported), "static": dict(self.static)}
+
+
+def probe_capabilities(device: Device, optional: Iterable[str] = (), static: dict[str, str] | None = None) -> DeviceCapabilities:
+    """Probe optional properties and read static ones in a single concurrent batch."""
+    optional = list(optional)
+    static = static or {}
+    reads = [PropertyRead(attribute, attribute) for attribute in optional]
+    reads += [PropertyRead(key, attribute, optional=True) for key, attribute in static.items()]
+    result = PropertyBatch(*reads).fetch(device)
+
+    supported = {
+        attribute: not isinstance(result.errors.get(attribute), NotImplementedException)
+        for attribute in optional
+    }
+    static_values = {key: result.values[key] for key in static if key in result.values}
+    return DeviceCapabilities(supported=supported, static=static_values)
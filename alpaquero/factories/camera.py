@@ -3,6 +3,8 @@ from alpaca import camera
 from typing import TYPE_CHECKING
 
 from observatory.state import StateManager, CameraState
+from alpaquero.transport import AlpacaTransport
+from alpaquero.capabilities import probe_capabilities
 
 class CameraConnectionError(RuntimeError):
     pass
@@ -15,10 +17,13 @@ def camera_factory(
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> camera.Camera:
     try:
         print("connecting to camera", id, address)
         cam = camera.Camera(address, device_number)
+        if transport is not None:
+            transport.attach(cam)
         
         timeout = 0
         cam.Connected = True
@@ -28,7 +33,25 @@ def camera_factory(
                 print(f"Camera {id} connection timed out")
                 raise CameraConnectionError(f"Camera {id} connection timed out")
             sleep(1)
-        state.add_device(CameraState(id=id, connected=True))
+        capabilities = probe_capabilities(
+            cam,
+            optional=("Gain", "Offset", "LastExposureDuration", "LastExposureStartTime"),
+            static={
+                "x_size": "CameraXSize",
+                "y_size": "CameraYSize",
+                "max_adu": "MaxADU",
+                "max_bin_x": "MaxBinX",
+                "max_bin_y": "MaxBinY",
+                "can_abort": "CanAbortExposure",
+            },
+        )
+        state.add_device(CameraState(
+            id=id,
+            connected=True,
+            x_size=capabilities.get("x_size"),
+            y_size=capabilities.get("y_size"),
+        ))
+        state.set_capabilities(id, capabilities)
         return cam
     except Exception as e:
         print(f"Error connecting to camera {id}: {e}")
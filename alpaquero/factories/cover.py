@@ -2,6 +2,7 @@ from alpaca import covercalibrator
 from time import sleep
 
 from observatory.state import StateManager, CoverState
+from alpaquero.transport import AlpacaTransport
 
 class CoverConnectionError(RuntimeError):
     pass
@@ -12,10 +13,13 @@ def cover_factory(
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> covercalibrator.CoverCalibrator:
     try:
         print("connecting to cover calibrator", id, address)
         c = covercalibrator.CoverCalibrator(address, device_number)
+        if transport is not None:
+            transport.attach(c)
         timeout = 0
         c.Connect()
         while c.Connecting:
@@ -2,6 +2,7 @@ from alpaca import dome
 from time import sleep
 
 from observatory.state import StateManager, DomeState
+from alpaquero.transport import AlpacaTransport
 
 class DomeConnectionError(RuntimeError):
     pass
@@ -12,10 +13,13 @@ def dome_factory(
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> dome.Dome:
     try:
         print("connecting to dome", id, address)
         d = dome.Dome(address, device_number)
+        if transport is not None:
+            transport.attach(d)
         timeout = 0
         d.Connect()
         while d.Connecting:
@@ -4,6 +4,8 @@ from time import sleep
 from typing import TYPE_CHECKING
 
 from observatory.state import StateManager, FilterwheelState
+from alpaquero.transport import AlpacaTransport
+from alpaquero.capabilities import probe_capabilities
 
 class FilterWheelConnectionError(RuntimeError):
     pass
@@ -16,10 +18,13 @@ def filterwheel_factory(
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> filterwheel.FilterWheel:
     try:
         print("connecting to filter wheel", id, address)
         fw = filterwheel.FilterWheel(address, device_number)
+        if transport is not None:
+            transport.attach(fw)
         
         timeout = 0
         fw.Connected = True
@@ -29,12 +34,14 @@ def filterwheel_factory(
                 print(f"Filter wheel {id} connection timed out")
                 raise FilterWheelConnectionError(f"Filter wheel {id} connection timed out")
             sleep(1)
+        capabilities = probe_capabilities(fw, static={"names": "Names"})
         state.add_device(FilterwheelState(
             id=id,
             connected=True,
             position=fw.Position,
-            names=list(fw.Names) if hasattr(fw, 'Names') else None
+            names=capabilities.get("names"),
         ))
+        state.set_capabilities(id, capabilities)
         return fw
     except Exception as e:
         print(f"Error connecting to filter wheel {id}: {e}")
@@ -2,6 +2,7 @@ from alpaca import observingconditions
 from time import sleep
 
 from observatory.state import StateManager, ObservingConditionsState
+from alpaquero.transport import AlpacaTransport
 
 class ObservingConditionsConnectionError(RuntimeError):
     pass
@@ -12,10 +13,13 @@ def observing_conditions_factory(
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> observingconditions.ObservingConditions:
     try:
         print("connecting to observing conditions", id, address)
         oc = observingconditions.ObservingConditions(address, device_number)
+        if transport is not None:
+            transport.attach(oc)
         timeout = 0
         oc.Connect()
         while oc.Connecting:
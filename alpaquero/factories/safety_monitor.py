@@ -2,6 +2,7 @@ from alpaca import safetymonitor
 from time import sleep
 
 from observatory.state import StateManager, SafetyMonitorState
+from alpaquero.transport import AlpacaTransport
 
 class SafetyMonitorConnectionError(RuntimeError):
     pass
@@ -12,10 +13,13 @@ def safety_monitor_factory(
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> safetymonitor.SafetyMonitor:
     try:
         print("connecting to safety monitor", id, address)
         sm = safetymonitor.SafetyMonitor(address, device_number)
+        if transport is not None:
+            transport.attach(sm)
         timeout = 0
         sm.Connect()
         while sm.Connecting:
@@ -1,7 +1,14 @@
 from alpaca import switch
+import threading
+import time
 from time import sleep
+from typing import Any, Callable, Iterable
 
-from observatory.state import StateManager, SwitchControlState, SwitchState, ToggleControl, RangeControl
+from observatory.state import StateManager, SwitchControlRecord, SwitchRecord, ToggleControl, ToggleControlRecord, RangeControl, RangeControlRecord
+from observatory.state_records import to_record
+from alpaquero.transport import AlpacaTransport
+from alpaquero.capabilities import DeviceCapabilities
+from alpaquero.batch import PropertyBatch, PropertyRead
 
 class SwitchConnectionError(RuntimeError):
     pass
@@ -11,17 +18,19 @@ def _is_toggle_range(min_value: float, max_value: float, step: float) -> bool:
     return min_value == 0 and max_value == 1 and step == 1
 
 
-def _call_optional(alpaca_switch: switch.Switch, method_name: str, switch_id: int, default):
-    method = getattr(alpaca_switch, method_name, None)
-    if method is None:
-        return default
-    try:
-        return method(switch_id)
-    except Exception:
-        return default
+# control field -> (Alpaca method, value used when the driver does not answer)
+SWITCH_METADATA = {
+    "label": ("GetSwitchName", None),
+    "description": ("GetSwitchDescription", None),
+    "writeable": ("CanWrite", False),
+    "can_async": ("CanAsync", False),
+    "min_value": ("MinSwitchValue", 0.0),
+    "max_value": ("MaxSwitchValue", 1.0),
+    "step": ("SwitchStep", 1.0),
+}
 
 
-def _control_key(controls: dict[str, SwitchControlState], switch_id: int, label: str | None) -> str:
+def _control_key(controls: dict[str, SwitchControlRecord], switch_id: int, label: str | None) -> str:
     key = label or f"Switch {switch_id}"
     if key not in controls:
         return key
@@ -32,56 +41,204 @@ def _control_key(controls: dict[str, SwitchControlState], switch_id: int, label:
     return f"{key} ({suffix})"
 
 
-def enumerate_switch_controls(alpaca_switch: switch.Switch) -> dict[str, SwitchControlState]:
-    controls: dict[str, SwitchControlState] = {}
-
-    for switch_id in range(alpaca_switch.MaxSwitch):
-        switch_name = _call_optional(alpaca_switch, "GetSwitchName", switch_id, f"Switch {switch_id}")
-        description = _call_optional(alpaca_switch, "GetSwitchDescription", switch_id, None)
-        can_write = _call_optional(alpaca_switch, "CanWrite", switch_id, False)
-        can_async = _call_optional(alpaca_switch, "CanAsync", switch_id, False)
-        min_value = _call_optional(alpaca_switch, "MinSwitchValue", switch_id, 0.0)
-        max_value = _call_optional(alpaca_switch, "MaxSwitchValue", switch_id, 1.0)
-        step = _call_optional(alpaca_switch, "SwitchStep", switch_id, 1.0)
-
-        if _is_toggle_range(min_value, max_value, step):
-            value = _call_optional(alpaca_switch, "GetSwitch", switch_id, False)
-            control = ToggleControl(
-                id=switch_id,
-                label=switch_name,
-                description=description,
-                writeable=can_write,
-                can_async=can_async,
-                value=bool(value),
-            )
-        else:
-            value = _call_optional(alpaca_switch, "GetSwitchValue", switch_id, min_value)
-            control = RangeControl(
-                id=switch_id,
-                label=switch_name,
-                description=description,
-                writeable=can_write,
-                can_async=can_async,
-                min_value=min_value,
-                max_value=max_value,
-                step=step,
-                value=value,
-            )
-
-        controls[_control_key(controls, switch_id, switch_name)] = control
+def read_switch_metadata(alpaca_switch: switch.Switch, switch_ids: Iterable[int]) -> dict[int, dict[str, Any]]:
+    """Read the metadata of every given switch id in one concurrent batch."""
+    switch_ids = list(switch_ids)
+    reads = [
+        PropertyRead(f"{field}:{switch_id}", method, {"Id": switch_id}, optional=True)
+        for switch_id in switch_ids
+        for field, (method, _) in SWITCH_METADATA.items()
+    ]
+    result = PropertyBatch(*reads).fetch(alpaca_switch)
+
+    metadata: dict[int, dict[str, Any]] = {}
+    for switch_id in switch_ids:
+        fields = {}
+        for field, (_, default) in SWITCH_METADATA.items():
+            value = result.values.get(f"{field}:{switch_id}")
+            fields[field] = default if value is None else value
+        fields["label"] = fields["label"] or f"Switch {switch_id}"
+        metadata[switch_id] = fields
+    return metadata
+
+
+def control_metadata(control: SwitchControlRecord) -> dict[str, Any]:
+    """The metadata fields of an existing control, comparable with read_switch_metadata."""
+    fields = {
+        "label": control.label,
+        "description": control.description,
+        "writeable": control.writeable,
+        "can_async": control.can_async,
+        "min_value": 0.0,
+        "max_value": 1.0,
+        "step": 1.0,
+    }
+    if isinstance(control, RangeControlRecord):
+        fields.update(min_value=control.min_value, max_value=control.max_value, step=control.step)
+    return fields
+
+
+def build_switch_control(switch_id: int, metadata: dict[str, Any], value: Any = None) -> SwitchControlRecord:
+    # driver metadata goes through the model for validation before it is stored
+    if _is_toggle_range(metadata["min_value"], metadata["max_value"], metadata["step"]):
+        return to_record(ToggleControl(
+            id=switch_id,
+            label=metadata["label"],
+            description=metadata["description"],
+            writeable=metadata["writeable"],
+            can_async=metadata["can_async"],
+            value=bool(value),
+        ))
+    return to_record(RangeControl(
+        id=switch_id,
+        label=metadata["label"],
+        description=metadata["description"],
+        writeable=metadata["writeable"],
+        can_async=metadata["can_async"],
+        min_value=metadata["min_value"],
+        max_value=metadata["max_value"],
+        step=metadata["step"],
+        value=metadata["min_value"] if value is None else value,
+    ))
+
+
+def switch_value_key(control: SwitchControlRecord) -> str:
+    # keyed by switch id, not label, so a control named like another read in
+    # the batch (say "connected") cannot collide with it
+    return f"value:{control.id}"
+
+
+def switch_value_read(control: SwitchControlRecord) -> PropertyRead:
+    method = "GetSwitch" if isinstance(control, ToggleControlRecord) else "GetSwitchValue"
+    return PropertyRead(switch_value_key(control), method, {"Id": control.id})
+
 
+def enumerate_switch_controls(alpaca_switch: switch.Switch, max_switch: int) -> dict[str, SwitchControlRecord]:
+    metadata = read_switch_metadata(alpaca_switch, range(max_switch))
+    controls: dict[str, SwitchControlRecord] = {}
+    for switch_id, fields in metadata.items():
+        control = build_switch_control(switch_id, fields)
+        controls[_control_key(controls, switch_id, fields["label"])] = control
+
+    # initial values, again as one batch
+    values = PropertyBatch(*(switch_value_read(control) for control in controls.values())).fetch(alpaca_switch)
+    for key, control in controls.items():
+        value = values.values.get(switch_value_key(control))
+        if value is not None:
+            controls[key] = control.replace({"value": bool(value) if isinstance(control, ToggleControlRecord) else value})
     return controls
 
 
+class SwitchControlRefresher:
+    """Single-flight background re-enumeration of a switch device's controls.
+
+    Metadata of the switch ids in the device's profile is re-read
+    concurrently, diffed against the current controls, and only ids whose
+    metadata changed are replaced in state. The refresh is handed to
+    ``submit`` (the device's ``Alpaquero.submit_background``), so it runs
+    off the polling step without a thread of its own. The switch count is
+    part of the profile and is only re-probed when the device reconnects.
+    """
+
+    def __init__(
+            self,
+            device_id: str,
+            state: "StateManager",
+            submit: Callable[[Callable[[], Any]], Any],
+            interval: float = 300,
+            min_interval: float = 10,
+        ):
+        self._device_id = device_id
+        self._state = state
+        self._submit = submit
+        self._interval = interval
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._running = False
+        self._last_run = time.monotonic()
+
+    def request(self, alpaca_switch: switch.Switch, force: bool = False) -> bool:
+        """Start a refresh if one is due and none is running; returns whether one started."""
+        with self._lock:
+            if self._running:
+                return False
+            elapsed = time.monotonic() - self._last_run
+            if elapsed < (self._min_interval if force else self._interval):
+                return False
+            self._last_run = time.monotonic()
+            self._running = True
+        try:
+            self._submit(lambda: self._refresh(alpaca_switch))
+        except Exception as e:
+            print(f"Error scheduling re-enumeration of switch {self._device_id}: {e}")
+            with self._lock:
+                self._running = False
+            return False
+        return True
+
+    def _refresh(self, alpaca_switch: switch.Switch):
+        try:
+            capabilities = self._state.get_capabilities(self._device_id) or DeviceCapabilities()
+            max_switch = capabilities.get("max_switch", len(self._state.get_device(self._device_id).controls))
+            metadata = read_switch_metadata(alpaca_switch, range(max_switch))
+            # diff under the device's write lock so values committed by the
+            # updater in the meantime are carried over, not overwritten
+            with self._state.edit_device(self._device_id) as device:
+                upsert, remove = diff_switch_controls(device.controls, metadata)
+                for key in remove:
+                    device.controls.pop(key, None)
+                device.controls.update(upsert)
+            if upsert or remove:
+                print(f"Switch {self._device_id} controls changed: {len(upsert)} updated, {len(remove)} removed")
+        except Exception as e:
+            print(f"Error re-enumerating switch {self._device_id}: {e}")
+        finally:
+            with self._lock:
+                self._running = False
+
+
+def diff_switch_controls(
+        controls: dict[str, SwitchControlRecord],
+        metadata: dict[int, dict[str, Any]],
+    ) -> tuple[dict[str, SwitchControlRecord], list[str]]:
+    """Controls to add or replace, and keys to drop, to bring ``controls`` in line with ``metadata``."""
+    current = {control.id: (key, control) for key, control in controls.items()}
+    remove = [
+        key for switch_id, (key, control) in current.items()
+        if switch_id not in metadata or control_metadata(control) != metadata[switch_id]
+    ]
+    kept = {key: control for key, control in controls.items() if key not in remove}
+
+    upsert: dict[str, SwitchControlRecord] = {}
+    for switch_id, fields in metadata.items():
+        key, control = current.get(switch_id, (None, None))
+        if control is not None and key not in remove:
+            continue
+        new_control = build_switch_control(switch_id, fields)
+        if control is not None and type(control) is type(new_control):
+            # keep the last polled value until the next tick reads it again
+            new_control = new_control.replace({"value": control.value})
+        if control is None or control.label != fields["label"]:
+            key = _control_key({**kept, **upsert}, switch_id, fields["label"])
+        upsert[key] = new_control
+
+    # a replaced control that keeps its key is an update, not a removal
+    remove = [key for key in remove if key not in upsert]
+    return upsert, remove
+
+
 def switch_factory(
         address: str,
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> switch.Switch:
     try:
         print("connecting to switch", id, address)
         s = switch.Switch(address, device_number)
+        if transport is not None:
+            transport.attach(s)
         timeout = 0
         s.Connect()
         while s.Connecting:
@@ -91,9 +248,11 @@ def switch_factory(
                     raise SwitchConnectionError("Switch connection timed out")
                 sleep(1)
         
-        controls = enumerate_switch_controls(s)
+        max_switch = s.MaxSwitch
+        controls = enumerate_switch_controls(s, max_switch)
         
-        state.add_device(SwitchState(id=id, connected=True, controls=controls))
+        state.add_device(SwitchRecord(id=id, connected=True, controls=controls))
+        state.set_capabilities(id, DeviceCapabilities(static={"max_switch": max_switch}))
         return s
     except Exception as e:
         print(f"Error connecting to switch: {e}")
@@ -2,6 +2,8 @@ from alpaca import telescope
 from time import sleep
 
 from observatory.state import StateManager, TelescopeState
+from alpaquero.transport import AlpacaTransport
+from alpaquero.capabilities import probe_capabilities
 
 class TelescopeConnectionError(RuntimeError):
     pass
@@ -12,10 +14,13 @@ def telescope_factory(
         id: str,
         device_number: int = 0,
         state: "StateManager" = None,
+        transport: "AlpacaTransport | None" = None,
     ) -> telescope.Telescope:
     try:
         print("connecting to telescope", id, address)
         t = telescope.Telescope(address, device_number)
+        if transport is not None:
+            transport.attach(t)
         timeout = 0
         t.Connect()
         while t.Connecting:
@@ -24,7 +29,9 @@ def telescope_factory(
                     print("Telescope connection timed out")
                     raise TelescopeConnectionError("Telescope connection timed out")
                 sleep(1)
+        capabilities = probe_capabilities(t, optional=("SideOfPier", "TargetRightAscension", "TargetDeclination"))
         state.add_device(TelescopeState(id=id, connected=True))
+        state.set_capabilities(id, capabilities)
         return t
     except Exception as e:
         print(f"Error connecting to telescope: {e}")
@@ -0,0 +1,152 @@
+from __future__ import annotations
+from bisect import bisect_left
+import threading
+import time
+from typing import Any
+
+
+class Histogram:
+    """Fixed-bucket histogram: recording is a bisect and a few integer updates."""
+
+    # upper bounds in seconds, the last bucket catches everything slower
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": {
+                **{f"le_{bound:g}": count for bound, count in zip(self.buckets, self.counts)},
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class PropertyLatency:
+    __slots__ = ("count", "errors", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.max if self.count else None,
+            "last": self.last if self.count else None,
+        }
+
+
+class PollMetrics:
+    """Polling counters for one Alpaquero.
+
+    Everything is aggregated as it is recorded (bucket counts, sums, maxima),
+    so memory stays constant and each record costs one short lock hold.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ticks = Histogram()
+        self.properties: dict[str, PropertyLatency] = {}
+        self.errors = 0
+        self.state_errors = 0
+        self.reconnects = 0
+        self.reconnect_failures = 0
+        self.last_success: float | None = None
+        self.last_error: str | None = None
+        self.last_error_time: float | None = None
+
+    def record_tick(self, duration: float):
+        with self._lock:
+            self.ticks.observe(duration)
+            self.last_success = time.time()
+
+    def record_property(self, attribute: str, duration: float, ok: bool):
+        with self._lock:
+            latency = self.properties.get(attribute)
+            if latency is None:
+                latency = self.properties[attribute] = PropertyLatency()
+            latency.count += 1
+            latency.total += duration
+            latency.last = duration
+            if duration > latency.max:
+                latency.max = duration
+            if not ok:
+                latency.errors += 1
+
+    def record_error(self, error: Exception, state_error: bool = False):
+        with self._lock:
+            if state_error:
+                self.state_errors += 1
+            else:
+                self.errors += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            self.last_error_time = time.time()
+
+    def record_reconnect(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.reconnects += 1
+            else:
+                self.reconnect_failures += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "ticks": self.ticks.to_dict(),
+                "properties": {attribute: latency.to_dict() for attribute, latency in self.properties.items()},
+                "errors": self.errors,
+                "state_errors": self.state_errors,
+                "reconnects": self.reconnects,
+                "reconnect_failures": self.reconnect_failures,
+                "last_success": self.last_success,
+                "last_error": self.last_error,
+                "last_error_time": self.last_error_time,
+            }
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "last_success": self.last_success,
+                "tick_p50": self.ticks.quantile(0.5),
+                "tick_p95": self.ticks.quantile(0.95),
+                "tick_max": self.ticks.max if self.ticks.count else None,
+                "errors": self.errors,
+                "reconnects": self.reconnects,
+                "reconnect_failures": self.reconnect_failures,
+                "last_error": self.last_error,
+            }
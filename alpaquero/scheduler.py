@@ -0,0 +1,153 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from alpaquero.alpaquero import Alpaquero
+
+
+class AlpaqueroScheduler:
+    """Polls any number of Alpaqueros from a single asyncio task.
+
+    Each device's update step is still blocking alpyca I/O, so steps are
+    handed to a fixed-size pool of ``max_workers`` threads, each request
+    bounded by the transport's read timeout. Steps of devices that are down
+    (a factory reconnect can block for several seconds per attempt) run on a
+    separate pool of ``connect_workers`` threads, so dead devices only ever
+    wait on each other and never hold up polling of the live ones; background
+    jobs from ``submit_background`` share that pool. The thread count stays
+    fixed no matter how many devices are registered.
+    """
+
+    def __init__(self, max_workers: int = 4, connect_workers: int = 2):
+        self._max_workers = max_workers
+        self._connect_workers = connect_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._connect_executor: ThreadPoolExecutor | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._polls: set[asyncio.Task] = set()
+
+        # heap of (due, seq, generation, alpaquero); stale generations are dropped
+        self._lock = threading.Lock()
+        self._heap: list[tuple[float, int, int, "Alpaquero"]] = []
+        self._generations: dict[int, int] = {}
+        self._in_flight: set[int] = set()
+        self._scheduled: set[int] = set()
+        self._seq = itertools.count()
+        # never reused, so a step left over from a removed run can't pass for
+        # the run that re-added the device
+        self._generation_seq = itertools.count(1)
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="Alpaquero-worker")
+        self._connect_executor = ThreadPoolExecutor(max_workers=self._connect_workers, thread_name_prefix="Alpaquero-connect")
+        self._task = self._loop.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for executor in (self._executor, self._connect_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._connect_executor = None
+
+    def submit_background(self, job: Callable[[], Any]) -> Future:
+        """Run housekeeping that must not hold up a polling step on the connect pool."""
+        if self._connect_executor is None:
+            raise RuntimeError("Alpaquero scheduler is not running")
+        return self._connect_executor.submit(job)
+
+    def add(self, alpaquero: "Alpaquero", delay: float = 0):
+        key = id(alpaquero)
+        with self._lock:
+            generation = next(self._generation_seq)
+            self._generations[key] = generation
+            # an in-flight step reschedules itself under the new generation
+            if key not in self._in_flight:
+                self._push(alpaquero, generation, delay)
+        self._notify()
+
+    def remove(self, alpaquero: "Alpaquero"):
+        key = id(alpaquero)
+        with self._lock:
+            self._generations.pop(key, None)
+            self._scheduled.discard(key)
+
+    def is_registered(self, alpaquero: "Alpaquero") -> bool:
+        with self._lock:
+            return id(alpaquero) in self._generations
+
+    def _push(self, alpaquero: "Alpaquero", generation: int, delay: float):
+        self._scheduled.add(id(alpaquero))
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), generation, alpaquero))
+
+    def _notify(self):
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _pop_due(self) -> tuple[list[tuple[int, "Alpaquero"]], float | None]:
+        due = []
+        now = time.monotonic()
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, generation, alpaquero = heapq.heappop(self._heap)
+                key = id(alpaquero)
+                if self._generations.get(key) != generation:
+                    continue
+                self._scheduled.discard(key)
+                self._in_flight.add(key)
+                due.append((generation, alpaquero))
+            timeout = self._heap[0][0] - now if self._heap else None
+        return due, timeout
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            due, timeout = self._pop_due()
+            for generation, alpaquero in due:
+                task = self._loop.create_task(self._poll(alpaquero, generation))
+                self._polls.add(task)
+                task.add_done_callback(self._polls.discard)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, alpaquero: "Alpaquero", generation: int):
+        key = id(alpaquero)
+        delay = alpaquero._poll_time
+        # a step without a connection is a reconnect attempt
+        executor = self._executor if alpaquero._alpaca is not None else self._connect_executor
+        try:
+            delay = await self._loop.run_in_executor(executor, alpaquero._step, alpaquero._stop)
+        except Exception as e:
+            print(f"Error polling {alpaquero.name} from scheduler:", e)
+        finally:
+            with self._lock:
+                self._in_flight.discard(key)
+                current = self._generations.get(key)
+                if current is not None and key not in self._scheduled and not alpaquero._stop.is_set():
+                    self._push(alpaquero, current, delay if current == generation else 0)
+            self._wakeup.set()
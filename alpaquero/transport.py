@@ -0,0 +1,128 @@
+from __future__ import annotations
+import threading
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from alpaca.device import Device
+
+from alpaquero.breaker import HostCircuitBreaker
+
+
+class TransportSession(requests.Session):
+    """requests session that applies the transport's timeouts and counts traffic."""
+
+    def __init__(self, transport: "AlpacaTransport"):
+        super().__init__()
+        self._transport = transport
+
+    @property
+    def read_timeout(self) -> float:
+        return self._transport.read_timeout
+
+    @property
+    def connect_timeout(self) -> float:
+        return self._transport.connect_timeout
+
+    def request(self, method, url, *args, **kwargs):
+        # alpyca passes its fixed 5 s default on every call, so a plain number
+        # is nobody's choice and the transport's timeouts apply; callers that
+        # need another read timeout pass an explicit (connect, read) pair
+        if not isinstance(kwargs.get("timeout"), tuple):
+            kwargs["timeout"] = (self._transport.connect_timeout, self._transport.read_timeout)
+        self._transport._count_request()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.ConnectionError:
+            # refused, unreachable or connect timeout: the host itself is down
+            self._transport._count_error()
+            self._transport.breaker.record_failure()
+            raise
+        except requests.RequestException:
+            self._transport._count_error()
+            raise
+        self._transport.breaker.record_success()
+        return response
+
+
+def request_timeout(session: requests.Session, read: float) -> tuple[float, float]:
+    """A (connect, read) timeout that a TransportSession keeps as given."""
+    return (getattr(session, "connect_timeout", read), read)
+
+
+class AlpacaTransport:
+    """Pooled keep-alive HTTP transport shared by every device on one Alpaca server.
+
+    Each alpyca device normally builds its own ``requests.Session``; attaching
+    the transport swaps that for a single session whose connection pool is
+    capped at ``pool_size``. Callers that would exceed the cap wait for a free
+    connection instead of opening throwaway sockets.
+    """
+
+    def __init__(
+            self,
+            address: str,
+            pool_size: int = 8,
+            connect_timeout: float = 2.0,
+            read_timeout: float = 5.0,
+            breaker: HostCircuitBreaker | None = None,
+        ):
+        self.address = address
+        self.breaker = breaker or HostCircuitBreaker(address)
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session = TransportSession(self)
+        self.session.mount("http://", self._adapter)
+        self.session.mount("https://", self._adapter)
+
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._errors = 0
+
+    def attach(self, device: Device) -> Device:
+        if device.rqs is not self.session:
+            device.rqs.close()
+            device.rqs = self.session
+        return device
+
+    def close(self):
+        self.session.close()
+
+    def _count_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def _count_error(self):
+        with self._lock:
+            self._errors += 1
+
+    def stats(self) -> dict[str, Any]:
+        connections = 0
+        idle = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            try:
+                pool = pools[key]
+            except KeyError:
+                continue
+            connections += pool.num_connections
+            # the pool queue holds None placeholders for unopened slots
+            if pool.pool is not None:
+                idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+        with self._lock:
+            requests_sent = self._requests
+            errors = self._errors
+        return {
+            "address": self.address,
+            "pool_size": self.pool_size,
+            "requests": requests_sent,
+            "errors": errors,
+            "connections_opened": connections,
+            "connections_reused": max(requests_sent - connections, 0),
+            "idle_connections": idle,
+            "breaker": self.breaker.stats(),
+        }
@@ -1,28 +1,38 @@
 from observatory.state import StateManager, CameraState
 from observatory.devices.camera import AlpaqueroCamera
+from alpaquero.batch import PropertyBatch
+
+CAMERA_PROPERTIES = PropertyBatch.of(
+    {
+        "connected": "Connected",
+        "camera_state": "CameraState",
+        "cooler_on": "CoolerOn",
+        "cooler_power": "CoolerPower",
+        "ccd_temperature": "CCDTemperature",
+        "set_ccd_temperature": "SetCCDTemperature",
+        "bin_x": "BinX",
+        "bin_y": "BinY",
+        "gain": "Gain",
+        "image_ready": "ImageReady",
+        "last_exposure_duration": "LastExposureDuration",
+        "last_exposure_start_time": "LastExposureStartTime",
+    },
+    optional=("gain", "last_exposure_duration", "last_exposure_start_time"),
+)
+
+# numeric fields kept in the telemetry history
+CAMERA_TELEMETRY = ("ccd_temperature", "cooler_power")
 
 def camera_updater(camera: "AlpaqueroCamera", id, state: "StateManager" = None):
-    if not camera.alpaca.Connected:
+    # sensor size comes from the capability profile and is not re-read
+    result = CAMERA_PROPERTIES.fetch(camera.alpaca, state.get_capabilities(id), camera.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values["connected"]:
         raise ConnectionError(f"Camera {id} not connected")
-    
+
     try:
-        device = state.get_device(id)
-        device.connected = camera.alpaca.Connected
-        device.camera_state = camera.alpaca.CameraState
-        device.cooler_on = camera.alpaca.CoolerOn
-        device.cooler_power = camera.alpaca.CoolerPower
-        device.ccd_temperature = camera.alpaca.CCDTemperature
-        device.set_ccd_temperature = camera.alpaca.SetCCDTemperature
-        device.bin_x = camera.alpaca.BinX
-        device.bin_y = camera.alpaca.BinY
-        device.x_size = camera.alpaca.CameraXSize
-        device.y_size = camera.alpaca.CameraYSize
-        device.gain = camera.alpaca.Gain if hasattr(camera.alpaca, 'Gain') else None
-        device.image_ready = camera.alpaca.ImageReady
-        
-        if hasattr(camera.alpaca, 'LastExposureDuration'):
-            device.last_exposure_duration = camera.alpaca.LastExposureDuration
-        if hasattr(camera.alpaca, 'LastExposureStartTime'):
-            device.last_exposure_start_time = camera.alpaca.LastExposureStartTime
+        result.report(f"camera {id}")
+        camera.observatory.telemetry.record(id, {field: result.values.get(field) for field in CAMERA_TELEMETRY})
+        state.update_device(id, **result.values)
     except Exception as e:
-        print(f"Error updating camera state: {e}")
\ No newline at end of file
+        print(f"Error updating camera state: {e}")
@@ -1,19 +1,28 @@
 from typing import TYPE_CHECKING
 from observatory.state import StateManager, CoverState
 from observatory.devices.cover import AlpaqueroCover
+from alpaquero.batch import PropertyBatch
 
 if TYPE_CHECKING:
     from observatory.state import StateManager
 
+COVER_PROPERTIES = PropertyBatch.of(
+    {
+        "connected": "Connected",
+        "cover_status": "CoverState",
+        "calibrator_status": "CalibratorState",
+        "brightness": "Brightness",
+    }
+)
+
 def cover_updater(cover: "AlpaqueroCover", id, state: "StateManager" = None):
-    if not cover.alpaca.Connected:
+    result = COVER_PROPERTIES.fetch(cover.alpaca, metrics=cover.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values["connected"]:
         raise ConnectionError("Cover calibrator not connected")
     
     try:
-        device = state.get_device(id)
-        device.connected = cover.alpaca.Connected
-        device.cover_status = cover.alpaca.CoverState
-        device.calibrator_status = cover.alpaca.CalibratorState
-        device.brightness = cover.alpaca.Brightness
+        result.report(f"cover calibrator {id}")
+        state.update_device(id, **result.values)
     except Exception as e:
-        print(f"Error updating cover calibrator state: {e}")
\ No newline at end of file
+        print(f"Error updating cover calibrator state: {e}")
@@ -1,16 +1,25 @@
 from observatory.state import StateManager, DomeState
 from observatory.devices.dome import AlpaqueroDome
+from alpaquero.batch import PropertyBatch
+
+DOME_PROPERTIES = PropertyBatch.of(
+    {
+        "connected": "Connected",
+        "shutter_status": "ShutterStatus",
+    }
+)
 
 def dome_updater(dome: "AlpaqueroDome", id, state: "StateManager" = None):
-    if not dome.alpaca.Connected:
+    result = DOME_PROPERTIES.fetch(dome.alpaca, metrics=dome.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values["connected"]:
         raise ConnectionError("Dome not connected")
     
     try:
-        device = state.get_device(id)
-        device.connected = dome.alpaca.Connected
-        device.shutter_status = dome.alpaca.ShutterStatus
+        result.report(f"dome {id}")
+        state.update_device(id, **result.values)
 
-        if device.shutter_status == 4:
+        if result.values.get("shutter_status") == 4:
             print("Dome reported an error")
     except Exception as e:
-        print(f"Error updating dome state: {e}")
\ No newline at end of file
+        print(f"Error updating dome state: {e}")
@@ -1,16 +1,23 @@
 from observatory.state import StateManager, FilterwheelState
 from observatory.devices.filterwheel import AlpaqueroFilterWheel
+from alpaquero.batch import PropertyBatch
+
+FILTERWHEEL_PROPERTIES = PropertyBatch.of(
+    {
+        "connected": "Connected",
+        "position": "Position",
+    }
+)
 
 def filterwheel_updater(filterwheel: "AlpaqueroFilterWheel", id, state: "StateManager" = None):
-    if not filterwheel.alpaca.Connected:
+    result = FILTERWHEEL_PROPERTIES.fetch(filterwheel.alpaca, metrics=filterwheel.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values["connected"]:
         raise ConnectionError(f"Filter wheel {id} not connected")
     
     try:
-        device = state.get_device(id)
-        device.connected = filterwheel.alpaca.Connected
-        device.position = filterwheel.alpaca.Position
-        
-        if hasattr(filterwheel.alpaca, 'Names') and device.names is None:
-            device.names = list(filterwheel.alpaca.Names)
+        result.report(f"filter wheel {id}")
+        # filter names are read once by the factory
+        state.update_device(id, **result.values)
     except Exception as e:
-        print(f"Error updating filterwheel state: {e}")
\ No newline at end of file
+        print(f"Error updating filterwheel state: {e}")
@@ -1,21 +1,35 @@
 from observatory.state import StateManager, ObservingConditionsState
 from observatory.devices.observing_conditions import AlpaqueroObservingConditions
+from alpaquero.batch import PropertyBatch
+
+OBSERVING_CONDITIONS_PROPERTIES = PropertyBatch.of(
+    {
+        "connected": "Connected",
+        "sky_temperature": "SkyTemperature",
+        "ambient": "Temperature",
+        "rain": "RainRate",
+        "wind": "WindSpeed",
+        "humidity": "Humidity",
+        "dew_point": "DewPoint",
+        "pressure": "Pressure",
+        "daylight": "SkyBrightness",
+    }
+)
 
 def observing_conditions_updater(observing_conditions: "AlpaqueroObservingConditions", id, state: "StateManager" = None):
-    if not observing_conditions.alpaca.Connected:
+    result = OBSERVING_CONDITIONS_PROPERTIES.fetch(observing_conditions.alpaca, metrics=observing_conditions.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values["connected"]:
         raise ConnectionError("Observing conditions not connected")
     
     try:
-        device = state.get_device(id)
-        device.connected = observing_conditions.alpaca.Connected
-        device.sky_ambient = observing_conditions.alpaca.SkyTemperature - observing_conditions.alpaca.Temperature
-        device.ambient = observing_conditions.alpaca.Temperature
-        device.rain = observing_conditions.alpaca.RainRate
-        device.wind = observing_conditions.alpaca.WindSpeed
-        device.humidity = observing_conditions.alpaca.Humidity
-        device.dew_point = observing_conditions.alpaca.DewPoint
-        device.pressure = observing_conditions.alpaca.Pressure
-        device.daylight = observing_conditions.alpaca.SkyBrightness
+        result.report(f"observing conditions {id}")
+        values = result.values
+        sky_temperature = values.pop("sky_temperature", None)
+        if sky_temperature is not None and values.get("ambient") is not None:
+            values["sky_ambient"] = sky_temperature - values["ambient"]
+        observing_conditions.observatory.telemetry.record(id, values)
+        state.update_device(id, **values)
 
     except Exception as e:
         print(f"Error updating observing conditions state: {e}")
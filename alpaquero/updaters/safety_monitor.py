@@ -1,13 +1,22 @@
 from observatory.state import StateManager, SafetyMonitorState
 from observatory.devices.safety_monitor import AlpaqueroSafetyMonitor
+from alpaquero.batch import PropertyBatch
+
+SAFETY_MONITOR_PROPERTIES = PropertyBatch.of(
+    {
+        "connected": "Connected",
+        "safe": "IsSafe",
+    }
+)
 
 def safety_monitor_updater(safety_monitor: "AlpaqueroSafetyMonitor", id, state: "StateManager" = None):
-    if not safety_monitor.alpaca.Connected:
+    result = SAFETY_MONITOR_PROPERTIES.fetch(safety_monitor.alpaca, metrics=safety_monitor.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values["connected"]:
         raise ConnectionError("Safety monitor not connected")
     
     try:
-        device = state.get_device(id)
-        device.connected = safety_monitor.alpaca.Connected
-        device.safe = safety_monitor.alpaca.IsSafe
+        result.report(f"safety monitor {id}")
+        state.update_device(id, **result.values)
     except Exception as e:
         print(f"Error updating safety monitor state: {e}")
@@ -1,26 +1,49 @@
 from typing import TYPE_CHECKING
-from observatory.state import StateManager, SwitchState, ToggleControl, RangeControl
+from observatory.state import StateManager, ToggleControlRecord
 from observatory.devices.switch import AlpaqueroSwitch
-from alpaquero.factories.switch import enumerate_switch_controls
+from alpaquero.batch import PropertyBatch, PropertyRead
+from alpaquero.factories.switch import switch_value_key, switch_value_read
 
 if TYPE_CHECKING:
     from observatory.state import StateManager
 
 def switch_updater(switch_device: "AlpaqueroSwitch", id, state: "StateManager" = None):
-    if not switch_device.alpaca.Connected:
+    # controls are enumerated by the factory on (re)connect and patched in the
+    # background by the device's control refresher
+    device = state.get_device(id)
+    controls = dict(device.controls)
+    batch = PropertyBatch(
+        PropertyRead("connected", "Connected"),
+        *(switch_value_read(control) for control in controls.values()),
+    )
+    result = batch.fetch(switch_device.alpaca, metrics=switch_device.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values.pop("connected"):
         raise ConnectionError("Switch not connected")
-    
+
     try:
-        device = state.get_device(id)
-        device.connected = switch_device.alpaca.Connected
-        if isinstance(device, SwitchState) and len(device.controls) != switch_device.alpaca.MaxSwitch:
-            device.controls = enumerate_switch_controls(switch_device.alpaca)
-        
-        # Update each control
-        for control_name, control in device.controls.items():
-            if isinstance(control, ToggleControl):
-                control.value = switch_device.alpaca.GetSwitch(control.id)
-            elif isinstance(control, RangeControl):
-                control.value = switch_device.alpaca.GetSwitchValue(control.id)
+        if not device.connected:
+            state.set_device_connected(id, True)
+
+        changed = {}
+        for key, control in controls.items():
+            read_key = switch_value_key(control)
+            if read_key not in result.values:
+                continue
+            value = result.values[read_key]
+            if isinstance(control, ToggleControlRecord):
+                value = bool(value)
+            if control.value != value:
+                changed[key] = value
+        if changed:
+            state.set_switch_values(id, changed)
+
+        if result.errors:
+            # an id that stopped answering usually means the driver's switch
+            # list changed underneath us
+            result.report(f"switch {id}")
+            switch_device.control_refresher.request(switch_device.alpaca, force=True)
+        else:
+            switch_device.control_refresher.request(switch_device.alpaca)
     except Exception as e:
         print(f"Error updating switch state: {e}")
@@ -1,27 +1,42 @@
 from typing import TYPE_CHECKING
 from observatory.state import StateManager, TelescopeState
 from observatory.devices.telescope import AlpaqueroTelescope
+from alpaquero.batch import PropertyBatch
 
 if TYPE_CHECKING:
     from observatory.state import StateManager
 
+TELESCOPE_PROPERTIES = PropertyBatch.of(
+    {
+        "connected": "Connected",
+        "tracking": "Tracking",
+        "slewing": "Slewing",
+        "parked": "AtPark",
+        "ra": "RightAscension",
+        "dec": "Declination",
+        "side_of_pier": "SideOfPier",
+        "target_ra": "TargetRightAscension",
+        "target_dec": "TargetDeclination",
+    },
+    optional=("side_of_pier", "target_ra", "target_dec"),
+)
+
 def telescope_updater(telescope: "AlpaqueroTelescope", id, state: "StateManager" = None):
-    if not telescope.alpaca.Connected:
+    result = TELESCOPE_PROPERTIES.fetch(telescope.alpaca, state.get_capabilities(id), telescope.alpaquero.metrics)
+    result.raise_for("connected")
+    if not result.values["connected"]:
         raise ConnectionError("Telescope not connected")
     
     try:
-        device = state.get_device(id)
-        device.connected = telescope.alpaca.Connected
-        device.tracking = telescope.alpaca.Tracking
-        device.slewing = telescope.alpaca.Slewing
-        device.parked = telescope.alpaca.AtPark
-        device.position = {"ra": telescope.alpaca.RightAscension, "dec": telescope.alpaca.Declination}
-        device.side_of_pier = telescope.alpaca.SideOfPier
-        
-        if hasattr(telescope.alpaca, 'TargetRightAscension'):
-            device.target = {
-                "ra": telescope.alpaca.TargetRightAscension,
-                "dec": telescope.alpaca.TargetDeclination
-            }
+        result.report(f"telescope {id}")
+        values = result.values
+        ra, dec = values.pop("ra", None), values.pop("dec", None)
+        telescope.observatory.telemetry.record(id, {"ra": ra, "dec": dec})
+        if ra is not None and dec is not None:
+            values["position"] = {"ra": ra, "dec": dec}
+        target_ra, target_dec = values.pop("target_ra", None), values.pop("target_dec", None)
+        if target_ra is not None and target_dec is not None:
+            values["target"] = {"ra": target_ra, "dec": target_dec}
+        state.update_device(id, **values)
     except Exception as e:
-        print(f"Error updating telescope state: {e}")
\ No newline at end of file
+        print(f"Error updating telescope state: {e}")
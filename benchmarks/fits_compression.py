@@ -0,0 +1,112 @@
+"""Throughput of plain and tile-compressed FITS writes through the FitsWriter.
+
+Writes a batch of synthetic sky frames (Poisson noise on a bias level,
+uint16) uncompressed, and Rice/GZIP compressed both in the writer's
+process pool and inline in this process. While each batch runs a thread
+ticks every millisecond; its worst delay shows how much the work holds the
+GIL away from the rest of the API process.
+
+Run from the repository root: ``python -m benchmarks.fits_compression``
+"""
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import astropy.io.fits as fits
+
+from observatory.fits_io import compression_type, write_compressed_fits
+from observatory.fits_writer import FitsWriter
+from observatory.state import StateManager
+
+SHAPE = (4176, 6248)
+FRAMES = 6
+
+
+def sky_frame(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.poisson(300, SHAPE) + 1000).astype(np.uint16)
+
+
+def header() -> fits.Header:
+    hdr = fits.Header()
+    hdr["BZERO"] = 32768.0
+    hdr["BSCALE"] = 1.0
+    hdr["EXPTIME"] = 30.0
+    return hdr
+
+
+class TickMonitor:
+    """Worst lateness of a thread that wants to run every millisecond."""
+
+    def __init__(self):
+        self.worst = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        expected = time.perf_counter()
+        while not self._stop.is_set():
+            expected += 0.001
+            time.sleep(max(0.0, expected - time.perf_counter()))
+            now = time.perf_counter()
+            self.worst = max(self.worst, now - expected)
+            expected = max(expected, now)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._stop.set()
+        self._thread.join()
+
+
+def run(writer: FitsWriter, frames: list[np.ndarray], directory: str, compression: str | None, inline: bool):
+    suffix = ".fits.fz" if compression else ".fits"
+    filenames = [os.path.join(directory, f"frame_{i}{suffix}") for i in range(len(frames))]
+    with TickMonitor() as ticks:
+        started = time.perf_counter()
+        if inline:
+            for filename, frame in zip(filenames, frames):
+                write_compressed_fits(filename, frame, header(), compression)
+        else:
+            futures = [writer.submit("bench", f, frame, header(), compression) for f, frame in zip(filenames, frames)]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - started
+    size = sum(os.path.getsize(f) for f in filenames)
+    for filename in filenames:
+        os.remove(filename)
+    return elapsed, size, ticks.worst
+
+
+def main():
+    frames = [sky_frame(seed) for seed in range(FRAMES)]
+    raw_mb = sum(frame.nbytes for frame in frames) / 2**20
+    writer = FitsWriter(StateManager(), workers=2, queue_size=4, compress_workers=os.cpu_count() or 1)
+    # pay for starting the process pool before timing anything
+    with tempfile.TemporaryDirectory() as directory:
+        writer.submit("bench", os.path.join(directory, "warm.fits.fz"), frames[0][:64, :64].copy(), header(), "RICE_1").result()
+
+        print(f"{FRAMES} frames of {SHAPE[1]}x{SHAPE[0]} uint16, {raw_mb:.0f} MB raw, {os.cpu_count()} CPU(s)")
+        print(f"{'mode':22} {'seconds':>8} {'frames/s':>9} {'MB/s raw':>9} {'ratio':>6} {'worst tick ms':>14}")
+        cases = [
+            ("uncompressed", None, False),
+            ("rice, process pool", "rice", False),
+            ("rice, inline", "rice", True),
+            ("gzip, process pool", "gzip", False),
+            ("gzip, inline", "gzip", True),
+        ]
+        for name, option, inline in cases:
+            elapsed, size, worst = run(writer, frames, directory, compression_type(option), inline)
+            print(
+                f"{name:22} {elapsed:8.2f} {FRAMES / elapsed:9.2f} {raw_mb / elapsed:9.1f} "
+                f"{size / 2**20 / raw_mb:6.2f} {worst * 1000:14.1f}"
+            )
+    writer.stop()
+
+
+if __name__ == "__main__":
+    main()
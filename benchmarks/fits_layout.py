@@ -0,0 +1,89 @@
+"""Peak memory and time from ImageBytes body to FITS file, 2-D and 3-D frames.
+
+Compares the previous path (whole frame into an [x][y] array, transposed
+view handed to astropy's ``writeto``) with the current one (chunks
+scattered straight into a FITS-order array, written by ``write_fits``).
+Peak memory is what numpy allocates on top of the wire body, as seen by
+tracemalloc.
+
+Run from the repository root: ``python -m benchmarks.fits_layout``
+"""
+import io
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import astropy.io.fits as fits
+
+from alpaquero.imagebytes import read_imagebytes
+from observatory.fits_io import write_fits
+
+UINT16 = 8
+
+FRAMES = {
+    "2-D 6248x4176 uint16": (6248, 4176),
+    "3-D 3008x2008x3 uint16": (3008, 2008, 3),
+}
+
+
+def imagebytes_body(shape: tuple[int, ...]) -> bytes:
+    rng = np.random.default_rng(1)
+    pixels = rng.integers(0, 65535, shape, dtype=np.uint16)
+    dims = list(shape) + [0] * (3 - len(shape))
+    header = struct.pack("<11i", 1, 0, 0, 0, 44, UINT16, UINT16, len(shape), *dims)
+    return header + pixels.astype("<u2").tobytes()
+
+
+def header() -> fits.Header:
+    hdr = fits.Header()
+    hdr["BZERO"] = 32768.0
+    hdr["BSCALE"] = 1.0
+    hdr["EXPTIME"] = 1.0
+    return hdr
+
+
+def previous(body: bytes, filename: str):
+    stream = io.BytesIO(body)
+    *_, rank, dim1, dim2, dim3 = struct.unpack("<11i", stream.read(44))
+    shape = (dim1, dim2, dim3) if rank == 3 else (dim1, dim2)
+    img = np.empty(shape, dtype=np.uint16)
+    stream.readinto(memoryview(img).cast("B"))
+    nda = img.transpose() if rank == 2 else img.transpose(2, 1, 0)
+    fits.PrimaryHDU(nda, header=header()).writeto(filename, overwrite=True)
+
+
+def current(body: bytes, filename: str):
+    nda, _ = read_imagebytes(io.BytesIO(body), lambda _: np.uint16)
+    write_fits(filename, nda, header())
+
+
+def measure(fn, body: bytes, filename: str) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn(body, filename)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "frame.fits")
+        print(f"{'frame':26} {'path':9} {'image MB':>9} {'peak MB':>8} {'seconds':>8}")
+        for name, shape in FRAMES.items():
+            body = imagebytes_body(shape)
+            image_mb = (len(body) - 44) / 2**20
+            for label, fn in (("previous", previous), ("current", current)):
+                fn(body, filename)
+                elapsed, peak = measure(fn, body, filename)
+                print(f"{name:26} {label:9} {image_mb:9.1f} {peak:8.1f} {elapsed:8.3f}")
+            nda, _ = read_imagebytes(io.BytesIO(body), lambda _: np.uint16)
+            assert np.array_equal(fits.getdata(filename), nda)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Time and peak memory of downloading one 6 MP uint16 frame over ImageBytes.
+
+Compares alpyca's own ``Camera.ImageArray`` (its ImageBytes request, then
+nested Python lists that ``np.array`` copies again) with
+``alpaquero.imagebytes.download_image`` on the camera's pooled transport
+session. Both talk to a minimal in-process Alpaca server that answers
+``imagearray`` with an ImageBytes body. Peak memory is what tracemalloc
+sees during the download.
+
+Run from the repository root: ``python -m benchmarks.image_download``
+"""
+import struct
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from alpaca import camera
+
+from alpaquero.imagebytes import download_image
+from alpaquero.transport import AlpacaTransport
+
+WIDTH, HEIGHT = 3000, 2000
+INT32, UINT16 = 2, 8
+
+
+def imagebytes_body() -> bytes:
+    # Alpaca ImageArray order is [x][y]
+    pixels = (np.arange(WIDTH * HEIGHT, dtype=np.int64).reshape(WIDTH, HEIGHT) % 60000).astype("<u2")
+    header = struct.pack("<11i", 1, 0, 0, 0, 44, INT32, UINT16, 2, WIDTH, HEIGHT, 0)
+    return header + pixels.tobytes()
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    body = b""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if not self.path.split("?")[0].endswith("/imagearray") or "imagebytes" not in (self.headers.get("Accept") or ""):
+            self.send_error(400, "only ImageBytes imagearray requests are served")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/imagebytes")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+
+def measure(download) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    image = download()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert image.shape[0] * image.shape[1] == WIDTH * HEIGHT
+    return elapsed, peak / 1e6
+
+
+def main():
+    ImageHandler.body = imagebytes_body()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    address = f"127.0.0.1:{server.server_address[1]}"
+
+    pooled = camera.Camera(address, 0)
+    AlpacaTransport(address, read_timeout=60).attach(pooled)
+    plain = camera.Camera(address, 0)
+
+    cases = {
+        "alpyca ImageArray + np.array": lambda: np.array(plain.ImageArray, dtype=np.uint16),
+        "download_image": lambda: download_image(pooled, lambda element_type: np.uint16)[0],
+    }
+    print(f"{WIDTH}x{HEIGHT} uint16 frame")
+    print(f"{'path':30} {'seconds':>8} {'peak MB':>8}")
+    for name, download in cases.items():
+        download()
+        elapsed, peak = measure(download)
+        print(f"{name:30} {elapsed:8.2f} {peak:8.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
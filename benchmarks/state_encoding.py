@@ -0,0 +1,79 @@
+"""Payload size and encode time of a 30-device snapshot as JSON and MessagePack.
+
+Run from the repository root: ``python -m benchmarks.state_encoding``
+"""
+import json
+import random
+import time
+
+from observatory.encoding import MSGPACK, encode
+from observatory.state import (
+    CameraState, CoverState, DomeState, FilterwheelState, ObservingConditionsState,
+    RangeControl, SafetyMonitorState, StateManager, SwitchState, TelescopeState, ToggleControl,
+)
+
+
+def build_state() -> StateManager:
+    rng = random.Random(1)
+    state = StateManager()
+    for i in range(6):
+        state.add_device(ObservingConditionsState(
+            id=f"weather_{i}", connected=True, sky_ambient=rng.uniform(-40, -10), ambient=rng.uniform(-5, 25),
+            rain=0.0, wind=rng.uniform(0, 15), daylight=rng.uniform(0, 1e4), humidity=rng.uniform(10, 90),
+            dew_point=rng.uniform(-10, 10), pressure=rng.uniform(990, 1030),
+        ))
+    for i in range(6):
+        state.add_device(CameraState(
+            id=f"camera_{i}", connected=True, ccd_temperature=rng.uniform(-25, -15), camera_state=0,
+            x_size=4096, y_size=4096, cooler_on=True, cooler_power=rng.uniform(20, 80), gain=100,
+            image_ready=False, last_exposure_duration=120.0, last_exposure_start_time="2026-01-01T00:00:00",
+            set_ccd_temperature=-20.0,
+        ))
+    for i in range(6):
+        state.add_device(TelescopeState(
+            id=f"telescope_{i}", connected=True, tracking=True,
+            position={"ra": rng.uniform(0, 24), "dec": rng.uniform(-90, 90)},
+            target={"ra": rng.uniform(0, 24), "dec": rng.uniform(-90, 90)}, side_of_pier=0,
+        ))
+    for i in range(3):
+        state.add_device(DomeState(id=f"dome_{i}", connected=True, shutter_status=0))
+        state.add_device(CoverState(id=f"cover_{i}", connected=True, cover_status=3, calibrator_status=1))
+        state.add_device(FilterwheelState(id=f"filterwheel_{i}", connected=True, names=list("LRGBHOS"), position=2))
+    for i in range(2):
+        controls = {f"Power {j}": ToggleControl(id=j, label=f"Power {j}", value=bool(j % 2)) for j in range(8)}
+        controls.update({
+            f"Dew heater {j}": RangeControl(id=8 + j, label=f"Dew heater {j}", max_value=255, value=rng.uniform(0, 255))
+            for j in range(8)
+        })
+        state.add_device(SwitchState(id=f"switch_{i}", connected=True, controls=controls))
+    state.add_device(SafetyMonitorState(id="safety", connected=True, safe=True))
+    return state
+
+
+def timed(fn, repeat: int = 500) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    state = build_state()
+    snapshot = state.snapshot()
+    data = snapshot.model_dump()
+    print(f"{len(snapshot.devices)} devices")
+
+    cases = {
+        "json (model_dump_json)": lambda: snapshot.model_dump_json().encode(),
+        "json (model_dump + json.dumps)": lambda: json.dumps(snapshot.model_dump(mode="json")).encode(),
+        "msgpack (model_dump + packb)": lambda: encode(snapshot.model_dump(), MSGPACK),
+        "msgpack (packb of a dumped dict)": lambda: encode(data, MSGPACK),
+    }
+    print(f"{'encoding':34} {'bytes':>8} {'encode us':>10}")
+    for name, fn in cases.items():
+        print(f"{name:34} {len(fn()):8d} {timed(fn):10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Memory and write cost of the state store on a 30-device observatory.
+
+Reports the memory the populated store retains per device (as seen by
+tracemalloc) and the time of the two hottest writes, ``update_device`` and
+``set_switch_values``. The script only uses the public StateManager API, so
+it can be run on older revisions for comparison.
+
+Run from the repository root: ``python -m benchmarks.state_store``
+"""
+import gc
+import random
+import time
+import tracemalloc
+
+from observatory.state import (
+    CameraState, CoverState, DomeState, FilterwheelState, ObservingConditionsState,
+    RangeControl, SafetyMonitorState, StateManager, SwitchState, TelescopeState, ToggleControl,
+)
+
+DEVICES = 30
+
+
+def populate(state: StateManager):
+    rng = random.Random(1)
+    for i in range(6):
+        state.add_device(ObservingConditionsState(
+            id=f"weather_{i}", connected=True, sky_ambient=rng.uniform(-40, -10), ambient=rng.uniform(-5, 25),
+            rain=0.0, wind=rng.uniform(0, 15), daylight=rng.uniform(0, 1e4), humidity=rng.uniform(10, 90),
+            dew_point=rng.uniform(-10, 10), pressure=rng.uniform(990, 1030),
+        ))
+        state.add_device(CameraState(
+            id=f"camera_{i}", connected=True, ccd_temperature=rng.uniform(-25, -15), camera_state=0,
+            x_size=4096, y_size=4096, cooler_on=True, cooler_power=rng.uniform(20, 80), gain=100,
+            image_ready=False, last_exposure_duration=120.0, last_exposure_start_time="2026-01-01T00:00:00",
+            set_ccd_temperature=-20.0,
+        ))
+        state.add_device(TelescopeState(
+            id=f"telescope_{i}", connected=True, tracking=True,
+            position={"ra": rng.uniform(0, 24), "dec": rng.uniform(-90, 90)},
+            target={"ra": rng.uniform(0, 24), "dec": rng.uniform(-90, 90)}, side_of_pier=0,
+        ))
+    for i in range(3):
+        state.add_device(DomeState(id=f"dome_{i}", connected=True, shutter_status=0))
+        state.add_device(CoverState(id=f"cover_{i}", connected=True, cover_status=3, calibrator_status=1))
+        state.add_device(FilterwheelState(id=f"filterwheel_{i}", connected=True, names=list("LRGBHOS"), position=2))
+    for i in range(2):
+        controls = {f"Power {j}": ToggleControl(id=j, label=f"Power {j}", value=bool(j % 2)) for j in range(8)}
+        controls.update({
+            f"Dew heater {j}": RangeControl(id=8 + j, label=f"Dew heater {j}", max_value=255, value=0.0)
+            for j in range(8)
+        })
+        state.add_device(SwitchState(id=f"switch_{i}", connected=True, controls=controls))
+    state.add_device(SafetyMonitorState(id="safety", connected=True, safe=True))
+
+
+def timed(fn, repeat: int = 20000) -> float:
+    started = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    state = StateManager()
+    populate(state)
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    update = timed(lambda i: state.update_device(f"camera_{i % 6}", ccd_temperature=float(i), cooler_power=i % 100))
+    switch = timed(lambda i: state.set_switch_values("switch_0", {"Dew heater 1": float(i)}))
+    print(f"memory per device   {retained // DEVICES:8d} B")
+    print(f"update_device       {update:8.1f} us")
+    print(f"set_switch_values   {switch:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
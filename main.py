@@ -23,7 +23,7 @@ async def lifespan(app: FastAPI):
     print("Starting up observatory...")
     try:
         observatory = Observatory()
-        observatory.startup()
+        await observatory.startup()
         app.state.observatory = observatory
         
     except Exception as e:
@@ -32,6 +32,7 @@ async def lifespan(app: FastAPI):
     
     yield
 
+    app.state.observatory.shutdown()
     app.state.observatory = None
     print("Shutting down observatory...")
 
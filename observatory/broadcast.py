@@ -0,0 +1,221 @@
+from __future__ import annotations
+import asyncio
+from collections import deque
+import json
+from typing import TYPE_CHECKING, Any
+
+from observatory.encoding import JSON, encode
+from observatory.state import ANY_KEY
+from observatory.state_diff import diff_snapshots
+
+if TYPE_CHECKING:
+    from observatory.state import Snapshot, StateManager
+
+
+class EncodedSnapshot:
+    """A snapshot's JSON text and plain-data form, each built on first use."""
+
+    __slots__ = ("snapshot", "_json", "_data")
+
+    def __init__(self, snapshot: "Snapshot"):
+        self.snapshot = snapshot
+        self._json: str | None = None
+        self._data: dict | None = None
+
+    def json(self) -> str:
+        if self._json is None:
+            self._json = self.snapshot.model_dump_json()
+        return self._json
+
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = self.snapshot.model_dump()
+        return self._data
+
+
+class HubMessage:
+    """One outgoing message, encoded at most once per wire format and shared by every client.
+
+    ``fields`` is the message envelope and ``state`` an optional snapshot
+    sent under ``"state"``. A message with only a state is the bare legacy
+    snapshot.
+    """
+
+    __slots__ = ("fields", "state", "_encoded")
+
+    def __init__(self, fields: dict[str, Any] | None, state: EncodedSnapshot | None = None):
+        self.fields = fields
+        self.state = state
+        self._encoded: dict[str, str | bytes] = {}
+
+    def encoded(self, encoding: str) -> str | bytes:
+        message = self._encoded.get(encoding)
+        if message is None:
+            message = self._encoded[encoding] = self._encode(encoding)
+        return message
+
+    def _encode(self, encoding: str) -> str | bytes:
+        if encoding == JSON:
+            # JSON goes out as text frames, everything else as binary
+            if self.state is None:
+                return json.dumps(self.fields)
+            if self.fields is None:
+                return self.state.json()
+            envelope = json.dumps(self.fields, separators=(",", ":"))
+            return f'{envelope[:-1]},"state":{self.state.json()}}}'
+        if self.state is None:
+            return encode(self.fields, encoding)
+        if self.fields is None:
+            return encode(self.state.data(), encoding)
+        return encode({**self.fields, "state": self.state.data()}, encoding)
+
+
+class HubClient:
+    """One subscriber's bounded outbox.
+
+    Snapshot-mode clients only ever hold the latest full snapshot. Delta-mode
+    clients queue patches up to ``max_queue``; on overflow the backlog is
+    dropped and replaced by a snapshot of the latest version, so a slow
+    client skips ahead instead of holding up the hub or growing without bound.
+    Messages are encoded in the client's ``encoding`` when taken off the queue.
+    """
+
+    def __init__(self, hub: "StateBroadcastHub", delta: bool, max_queue: int, encoding: str = JSON):
+        self.hub = hub
+        self.delta = delta
+        self.max_queue = max_queue
+        self.encoding = encoding
+        self.dropped = 0
+        self._queue: deque[HubMessage] = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, message: HubMessage):
+        if not self.delta:
+            self._queue.clear()
+        elif len(self._queue) >= self.max_queue:
+            self.dropped += len(self._queue)
+            self._queue.clear()
+            message = self.hub.snapshot_message()
+        self._queue.append(message)
+        self._ready.set()
+
+    def resync(self):
+        self._queue.clear()
+        self.offer(self.hub.snapshot_message() if self.delta else self.hub.legacy_message())
+
+    async def get(self) -> str | bytes:
+        while not self._queue:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._queue.popleft().encoded(self.encoding)
+
+
+class StateBroadcastHub:
+    """Serialises each state version once and fans the text out to every websocket client.
+
+    A single task follows the state store. Per version it builds at most one
+    legacy full snapshot and one delta patch (only for modes with
+    subscribers), and hands the same message to each client's outbox. ``seq``
+    is hub-wide: every broadcast increments it, and a snapshot carries the
+    seq of the version it shows, so delta clients expect ``seq + 1`` next.
+    """
+
+    def __init__(self, state: "StateManager", max_queue: int = 16, idle_resend: float = 30):
+        self.state = state
+        self.max_queue = max_queue
+        self.idle_resend = idle_resend
+        self._clients: set[HubClient] = set()
+        self._task: asyncio.Task | None = None
+
+        self._seq = 0
+        self._version, self._snapshot = state.versioned_snapshot()
+        self._encoded = EncodedSnapshot(self._snapshot)
+        self._snapshot_message: HubMessage | None = None
+        self._legacy_message: HubMessage | None = None
+
+    def start(self):
+        if self._task is None:
+            # nobody has been sent anything yet, so start from the current state
+            self._version, self._snapshot = self.state.versioned_snapshot()
+            self._encoded = EncodedSnapshot(self._snapshot)
+            self._snapshot_message = None
+            self._legacy_message = None
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def subscribe(self, delta: bool, encoding: str = JSON) -> HubClient:
+        self.start()
+        client = HubClient(self, delta, self.max_queue, encoding)
+        self._clients.add(client)
+        client.resync()
+        return client
+
+    def unsubscribe(self, client: HubClient):
+        self._clients.discard(client)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "seq": self._seq,
+            "version": self._version,
+            "dropped": sum(client.dropped for client in self._clients),
+        }
+
+    def snapshot_message(self) -> HubMessage:
+        if self._snapshot_message is None:
+            self._snapshot_message = HubMessage(
+                {"type": "snapshot", "seq": self._seq, "version": self._version},
+                self._encoded,
+            )
+        return self._snapshot_message
+
+    def legacy_message(self) -> HubMessage:
+        if self._legacy_message is None:
+            self._legacy_message = HubMessage(None, self._encoded)
+        return self._legacy_message
+
+    async def _run(self):
+        while True:
+            changed = await self.state.wait_for_change_async([ANY_KEY], self._version, timeout=self.idle_resend)
+            if changed is None:
+                self._heartbeat()
+            else:
+                self._broadcast(*self.state.versioned_snapshot())
+
+    def _advance(self, version: int, snapshot: "Snapshot"):
+        self._seq += 1
+        self._version, self._snapshot = version, snapshot
+        self._encoded = EncodedSnapshot(snapshot)
+        self._snapshot_message = None
+        self._legacy_message = None
+
+    def _broadcast(self, version: int, snapshot: "Snapshot"):
+        previous_version, previous = self._version, self._snapshot
+        self._advance(version, snapshot)
+
+        patch = None
+        for client in list(self._clients):
+            if client.delta:
+                if patch is None:
+                    patch = HubMessage({
+                        "type": "patch",
+                        "seq": self._seq,
+                        "version": version,
+                        "base_version": previous_version,
+                        "ops": diff_snapshots(previous, snapshot),
+                    })
+                client.offer(patch)
+            else:
+                client.offer(self.legacy_message())
+
+    def _heartbeat(self):
+        self._seq += 1
+        # the cached snapshot message carries the old seq
+        self._snapshot_message = None
+        heartbeat = HubMessage({"type": "heartbeat", "seq": self._seq, "version": self._version})
+        for client in list(self._clients):
+            client.offer(heartbeat if client.delta else self.legacy_message())
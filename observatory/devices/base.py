@@ -1,8 +1,10 @@
 from abc import ABC
 import asyncio
+import time
 from typing import Any, TypeVar, Generic, TYPE_CHECKING, Callable
 
 from observatory.action_registry import ActionRegistry
+from alpaquero.capabilities import DeviceCapabilities
 
 if TYPE_CHECKING:
     from observatory.observatory import Observatory
@@ -17,10 +19,15 @@ class ObservatoryDevice(ABC, Generic[TAlpaca]):
         self.id = id
         self.name = name or id
         self.alpaquero.set_on_destroy(self._mark_disconnected)
+        self.alpaquero.set_activity_probe(self.is_active)
 
     @property
     def alpaca(self) -> TAlpaca:
         return self.alpaquero.alpaca
+
+    @property
+    def capabilities(self) -> "DeviceCapabilities":
+        return self.observatory.state.get_capabilities(self.id) or DeviceCapabilities()
     
     @ActionRegistry.register("connect_device", observatory_arg=False, action_type="device")
     def connect(self):
@@ -30,6 +37,32 @@ class ObservatoryDevice(ABC, Generic[TAlpaca]):
     def disconnect(self):
         self.alpaquero.destroy()
 
+    def is_active(self) -> bool:
+        """Whether the device is mid-operation and should be polled at the fast interval."""
+        return False
+
+    def refresh_until(self, predicate: Callable[[Any], bool], timeout: float | None = None) -> bool:
+        """Force a poll, then wait on polled state until ``predicate(state_device)`` holds.
+
+        Actions use this instead of reading the device themselves. The device
+        is polled at its fast interval for as long as the wait lasts, even if
+        its own activity probe does not see the operation (a driver that
+        parks without reporting Slewing, say). Returns False if ``timeout``
+        passes or polling stops first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.alpaquero.polling_fast():
+            after = self.alpaquero.request_refresh()
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                if not self.alpaquero.wait_for_update(after, remaining):
+                    return False
+                if predicate(self.observatory.state.get_device(self.id)):
+                    return True
+                after = self.alpaquero.steps()
+
     def _mark_disconnected(self) -> None:
         try:
             self.observatory.state.set_device_connected(self.id, False)
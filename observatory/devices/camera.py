@@ -2,26 +2,38 @@ from observatory.action_registry import ActionRegistry
 from observatory.devices.base import ObservatoryDevice
 from alpaquero.alpaquero import Alpaquero
 from alpaca import camera
+from alpaca.camera import ImageArrayElementTypes
+from alpaquero.imagebytes import download_image
 from observatory.errors import CameraError
+from observatory.fits_io import compression_type
 from time import sleep
 import time
+from concurrent.futures import Future
 from typing import TYPE_CHECKING, Callable
 import numpy as np
 import astropy.io.fits as fits
 
 if TYPE_CHECKING:
     from observatory.observatory import Observatory
+    from observatory.observation_engine import ExecutionContext
 
 class AlpaqueroCamera(ObservatoryDevice[camera.Camera]):
-    def __init__(self, observatory: "Observatory", factory: Callable[[], camera.Camera], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1):
+    def __init__(self, observatory: "Observatory", factory: Callable[[], camera.Camera], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1, compression: str = None, **alpaquero_options):
+        # default FITS tile compression for this camera's frames, None for plain FITS
+        self.compression = compression_type(compression)
         alpaquero = Alpaquero(
             factory,
             updater,
             poll_time=poll_time,
             name=name or id,
+            **alpaquero_options,
         )
         super().__init__(observatory, alpaquero, id=id, name=name)
 
+    def is_active(self) -> bool:
+        # 1 = waiting, 2 = exposing, 3 = reading, 4 = download
+        return self.observatory.state.get_device(self.id).camera_state in (1, 2, 3, 4)
+
     @ActionRegistry.register("cool_camera", observatory_arg=False, action_type="device")
     def cool(self, target_temp: float):
         try:
@@ -58,88 +70,218 @@ class AlpaqueroCamera(ObservatoryDevice[camera.Camera]):
     @ActionRegistry.register("expose_camera", observatory_arg=False, action_type="device")
     def expose(self, exposure: float, binX: int = 1, binY: int = 1, startX: int = 0, startY: int = 0):
         try:
-            self.alpaca.BinX = binX
-            self.alpaca.BinY = binY
-            self.alpaca.StartX = startX
-            self.alpaca.StartY = startY
-            self.alpaca.NumX = self.alpaca.CameraXSize // self.alpaca.BinX
-            self.alpaca.NumY = self.alpaca.CameraYSize // self.alpaca.BinY
+            self._configure_frame(binX, binY, startX, startY)
+            nda = self._take_frame(exposure)
+            hdr = self._frame_header(nda, exposure, binX, binY, self._camera_settings())
+            return nda, hdr
+        except Exception as e:
+            raise CameraError(code="camera_expose_failed", message=f"Error exposing with camera {self.alpaquero.name}: {e}")
 
-            self.alpaca.StartExposure(exposure, True)
+    def _configure_frame(self, binX: int, binY: int, startX: int, startY: int):
+        self.alpaca.BinX = binX
+        self.alpaca.BinY = binY
+        self.alpaca.StartX = startX
+        self.alpaca.StartY = startY
+        capabilities = self.capabilities
+        x_size = capabilities.get("x_size") or self.alpaca.CameraXSize
+        y_size = capabilities.get("y_size") or self.alpaca.CameraYSize
+        self.alpaca.NumX = x_size // binX
+        self.alpaca.NumY = y_size // binY
 
-            while not self.alpaca.ImageReady:
-                sleep(0.5)
-            
-            img = self.alpaca.ImageArray
-            imginfo = self.alpaca.ImageArrayInfo
-
-            from alpaca.camera import ImageArrayElementTypes
-            if imginfo.ImageElementType == ImageArrayElementTypes.Int32:
-                if self.alpaca.MaxADU <= 65535:
-                    imgDataType = np.uint16
-                else:
-                    imgDataType = np.int32
-            elif imginfo.ImageElementType == ImageArrayElementTypes.Double:
-                imgDataType = np.float64
-            else:
-                imgDataType = np.uint16
-
-            if imginfo.Rank == 2:
-                nda = np.array(img, dtype=imgDataType).transpose()
-            else:
-                nda = np.array(img, dtype=imgDataType).transpose(2, 1, 0)
-
-            hdr = fits.Header()
-            if imgDataType == np.uint16:
-                hdr['BZERO'] = 32768.0
-                hdr['BSCALE'] = 1.0
-            hdr['EXPOSURE'] = exposure
-            hdr['EXPTIME'] = exposure
-            hdr['DATE-OBS'] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
-            hdr['TIMESYS'] = 'UTC'
-            hdr['XBINNING'] = self.alpaca.BinX
-            hdr['YBINNING'] = self.alpaca.BinY
-            hdr['INSTRUME'] = self.name
+    def _take_frame(self, exposure: float, aborted: Callable[[], bool] = None):
+        """Expose and download one frame; None if ``aborted()`` turned true first."""
+        self.alpaca.StartExposure(exposure, True)
+
+        # nothing to wait for until the exposure is nominally over
+        ends = time.monotonic() + exposure
+        while (remaining := ends - time.monotonic()) > 0:
+            if aborted is not None and aborted():
+                return self._abort_exposure()
+            sleep(min(remaining, 0.25))
+
+        # then ask the camera itself rather than waiting for the next state
+        # poll, which costs a large share of a short exposure; quickly at
+        # first, backing off through a slow readout
+        interval = 0.01
+        while not self.alpaca.ImageReady:
+            if aborted is not None and aborted():
+                return self._abort_exposure()
+            sleep(interval)
+            interval = min(interval * 2, 0.5)
+
+        # ImageBytes when the device offers it, JSON ImageArray otherwise;
+        # either way the array arrives contiguous in FITS row order
+        nda, _ = download_image(self.alpaca, self._image_dtype)
+        return nda
+
+    def _abort_exposure(self):
+        if self.capabilities.get("can_abort"):
+            self.alpaca.AbortExposure()
+        return None
+
+    def _camera_settings(self) -> fits.Header:
+        """Header cards for the camera's current gain and offset, where it has them."""
+        capabilities = self.capabilities
+        hdr = fits.Header()
+        if capabilities.supports("Gain"):
             try:
                 hdr['GAIN'] = self.alpaca.Gain
             except:
                 pass
+        if capabilities.supports("Offset"):
             try:
-                hdr['OFFSET'] = self.alpaca.Offset
-                if type(self.alpaca.Offset) == int:
-                    hdr['PEDESTAL'] = self.alpaca.Offset
+                offset = self.alpaca.Offset
+                hdr['OFFSET'] = offset
+                if type(offset) == int:
+                    hdr['PEDESTAL'] = offset
             except:
                 pass
-            hdr['HISTORY'] = 'Created using Python alpyca-client library'
+        return hdr
 
-            return nda, hdr
-        except Exception as e:
-            raise CameraError(code="camera_expose_failed", message=f"Error exposing with camera {self.alpaquero.name}: {e}")
+    def _frame_header(self, nda, exposure: float, binX: int, binY: int, settings: fits.Header) -> fits.Header:
+        hdr = fits.Header()
+        if nda.dtype == np.uint16:
+            hdr['BZERO'] = 32768.0
+            hdr['BSCALE'] = 1.0
+        hdr['EXPOSURE'] = exposure
+        hdr['EXPTIME'] = exposure
+        hdr['DATE-OBS'] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+        hdr['TIMESYS'] = 'UTC'
+        hdr['XBINNING'] = binX
+        hdr['YBINNING'] = binY
+        hdr['INSTRUME'] = self.name
+        hdr.extend(settings)
+        hdr['HISTORY'] = 'Created using Python alpyca-client library'
+        return hdr
+
+    def _image_dtype(self, element_type: int):
+        if element_type == ImageArrayElementTypes.Int32:
+            max_adu = self.capabilities.get("max_adu") or self.alpaca.MaxADU
+            return np.uint16 if max_adu <= 65535 else np.int32
+        if element_type == ImageArrayElementTypes.Double:
+            return np.float64
+        return np.uint16
+
+    def _compression(self, compression: str | None) -> str | None:
+        return self.compression if compression is None else compression_type(compression)
+
+    def _fits_filename(self, hdr, base_path: str, compression: str | None, frame: int = None) -> str:
+        suffix = ".fits.fz" if compression else ".fits"
+        # frames of a series can be less than a second apart
+        number = "" if frame is None else f"_{frame:04d}"
+        return f"{base_path}/{hdr['INSTRUME']}_{time.strftime('%Y%m%d_%H%M%S', time.gmtime())}{number}{suffix}"
 
     @ActionRegistry.register("create_fits", observatory_arg=False, action_type="device")
-    def create_fits(self, nda, hdr, additional_headers: dict, base_path: str):
+    def create_fits(self, nda, hdr, additional_headers: dict, base_path: str, compression: str = None):
+        """Write the frame and return its filename; ``compression`` ("rice", "gzip" or "none") overrides the camera's."""
         try:
+            compression = self._compression(compression)
             for k, v in additional_headers.items():
                 hdr[k] = v
 
-            hdu = fits.PrimaryHDU(nda, header=hdr)
-            filename = f"{base_path}/{hdr['INSTRUME']}_{time.strftime('%Y%m%d_%H%M%S', time.gmtime())}.fits"
-            hdu.writeto(filename, overwrite=True)
+            filename = self._fits_filename(hdr, base_path, compression)
+            self.observatory.fits_writer.write(filename, nda, hdr, compression)
             return filename
         except Exception as e:
             raise CameraError(code="fits_creation_failed", message=f"Error creating FITS file for camera {self.alpaquero.name}: {e}")
 
+    def save_fits(self, nda, hdr, additional_headers: dict, base_path: str, compression: str = None, frame: int = None) -> tuple[str, "Future[str]"]:
+        """Queue the frame on the observatory's FITS writer.
+
+        Returns the filename it will be written to and a Future that resolves
+        to it once it is on disk.
+        """
+        compression = self._compression(compression)
+        for k, v in additional_headers.items():
+            hdr[k] = v
+        filename = self._fits_filename(hdr, base_path, compression, frame)
+        self.observatory.state.set_message(f"camera_capture:{self.id}", f"Image captured, saving to {filename}")
+        return filename, self.observatory.fits_writer.submit(self.id, filename, nda, hdr, compression)
+
     @ActionRegistry.register("expose_and_save_camera", observatory_arg=False, action_type="device")
-    def expose_and_save(self, exposure: float, base_path: str, binX: int = 1, binY: int = 1, additional_headers: dict = None):
+    def expose_and_save(self, exposure: float, base_path: str, binX: int = 1, binY: int = 1, additional_headers: dict = None, wait: bool = True, compression: str = None):
+        """Expose, write the frame through the FITS writer and return its filename.
+
+        By default the call returns once the file is written and raises if it
+        could not be. With ``wait=False`` it returns as soon as the frame is
+        queued; the outcome is then only published as the
+        ``camera_capture:<id>`` message. ``compression`` overrides the
+        camera's default for this frame.
+        """
+        # reject a bad option before spending an exposure on it
+        self._compression(compression)
         nda, hdr = self.expose(exposure, binX, binY)
-        filename = self.create_fits(nda, hdr, additional_headers or {}, base_path)
-        self.observatory.state.set_message(
-            f"camera_capture:{self.id}",
-            f"Image captured and saved to {filename}",
-        )
+        filename, saved = self.save_fits(nda, hdr, additional_headers or {}, base_path, compression)
+        if wait:
+            saved.result()
         return filename
 
-    async def trigger_expose_and_save(self, exposure: float, base_path: str, binX: int = 1, binY: int = 1, additional_headers: dict = None):
+    @ActionRegistry.register("expose_series", observatory_arg=False, action_type="device")
+    def expose_series(
+            self,
+            exposure: float,
+            count: int,
+            base_path: str,
+            binX: int = 1,
+            binY: int = 1,
+            additional_headers: dict = None,
+            compression: str = None,
+            context: "ExecutionContext" = None,
+        ) -> list[str]:
+        """Take ``count`` frames back to back and return their filenames.
+
+        Binning, subframe, gain and offset are set up once for the series.
+        Each frame is handed to the FITS writer as soon as it is downloaded
+        and the next exposure starts straight away, so conversion,
+        compression and the disk write overlap the next exposure. Alpaca
+        only holds the latest image, so a frame's download still has to
+        finish before the next exposure starts. Progress is published as the
+        ``camera_series:<id>`` message. An abort on ``context`` stops the
+        series (aborting the current exposure if the camera can); pausing it
+        holds the series between frames. Returns once every frame taken is on
+        disk.
+        """
+        self._compression(compression)
+        message_id = f"camera_series:{self.id}"
+        aborted = context.is_aborted if context is not None else None
+        filenames: list[str] = []
+        saves: list["Future[str]"] = []
+        try:
+            self._configure_frame(binX, binY, 0, 0)
+            settings = self._camera_settings()
+            for frame in range(1, count + 1):
+                if context is not None:
+                    # pause between frames, the exposure in progress is not interrupted
+                    context.wait_resumed()
+                    if context.is_aborted():
+                        break
+                self.observatory.state.set_message(message_id, f"Frame {frame}/{count}: exposing {exposure}s")
+                nda = self._take_frame(exposure, aborted)
+                if nda is None:
+                    break
+                hdr = self._frame_header(nda, exposure, binX, binY, settings)
+                filename, saved = self.save_fits(nda, hdr, additional_headers or {}, base_path, compression, frame)
+                filenames.append(filename)
+                saves.append(saved)
+                # stop spending exposures once frames can't be stored
+                for done in saves:
+                    if done.done() and done.exception() is not None:
+                        done.result()
+            for saved in saves:
+                saved.result()
+        except CameraError as e:
+            self.observatory.state.set_message(message_id, f"Series failed after {len(filenames)}/{count} frames: {e.message}")
+            raise
+        except Exception as e:
+            self.observatory.state.set_message(message_id, f"Series failed after {len(filenames)}/{count} frames: {e}")
+            raise CameraError(code="camera_series_failed", message=f"Error taking series with camera {self.alpaquero.name}: {e}")
+
+        outcome = "aborted" if len(filenames) < count else "complete"
+        self.observatory.state.set_message(message_id, f"Series {outcome}: {len(filenames)}/{count} frames saved")
+        return filenames
+
+    async def trigger_expose_and_save(self, exposure: float, base_path: str, binX: int = 1, binY: int = 1, additional_headers: dict = None, compression: str = None):
+        self._compression(compression)
         self.dispatch_trigger(
             self.expose_and_save,
             exposure,
@@ -147,4 +289,8 @@ class AlpaqueroCamera(ObservatoryDevice[camera.Camera]):
             binX,
             binY,
             additional_headers,
+            # the HTTP caller has its answer already and follows the
+            # camera_capture message, so don't hold a thread for the write
+            wait=False,
+            compression=compression,
         )
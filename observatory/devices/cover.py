@@ -2,7 +2,6 @@ from observatory.devices.base import ObservatoryDevice
 from alpaquero.alpaquero import Alpaquero
 from alpaca import covercalibrator
 from observatory.errors import CoverError
-from time import sleep
 from typing import TYPE_CHECKING, Callable
 from observatory.safety import require_conditions
 from observatory.safety_conditions import *
@@ -13,37 +12,37 @@ if TYPE_CHECKING:
     from observatory.observatory import Observatory
 
 class AlpaqueroCover(ObservatoryDevice[covercalibrator.CoverCalibrator]):
-    def __init__(self, observatory: "Observatory", factory: Callable[[], covercalibrator.CoverCalibrator], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1):
+    def __init__(self, observatory: "Observatory", factory: Callable[[], covercalibrator.CoverCalibrator], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1, **alpaquero_options):
         alpaquero = Alpaquero(
             factory,
             updater,
             poll_time=poll_time,
             name=name or id,
+            **alpaquero_options,
         )
         super().__init__(observatory, alpaquero, id=id, name=name)
 
+    def is_active(self) -> bool:
+        # 2 = moving
+        return self.observatory.state.get_device(self.id).cover_status == 2
+
     @ActionRegistry.register("open_cover", observatory_arg=False, action_type="device")
     @require_conditions(weather_is_safe, dome_is_open, is_dark)
     def open(self, override: bool = False):
-        state_device = self.observatory.state.get_device(self.id)
         try:
             self.observatory.state.add_action(f"Opening {self.alpaquero.name}")
             self.alpaca.OpenCover()
             
             status = self.alpaca.CoverState
-            state_device.cover_status = status
+            self.observatory.state.update_device(self.id, cover_status=status)
             
             if status == 3:  # 3 = Open
                 self.observatory.state.remove_action(f"Opening {self.alpaquero.name}")
                 return
             elif status == 2:  # 2 = Moving
-                for _ in range(60):
-                    status = self.alpaca.CoverState
-                    state_device.cover_status = status
-                    if status == 3:
-                        self.observatory.state.remove_action(f"Opening {self.alpaquero.name}")
-                        return
-                    sleep(1)
+                if self.refresh_until(lambda d: d.cover_status == 3, timeout=60):
+                    self.observatory.state.remove_action(f"Opening {self.alpaquero.name}")
+                    return
                 self.observatory.state.remove_action(f"Opening {self.alpaquero.name}")
                 raise CoverError(code="cover_open_timeout", message=f"Opening cover {self.alpaquero.name} timed out")
             else:
@@ -56,25 +55,20 @@ class AlpaqueroCover(ObservatoryDevice[covercalibrator.CoverCalibrator]):
     @ActionRegistry.register("close_cover", observatory_arg=False, action_type="device")
     @require_conditions(dome_is_open)
     def close(self, override: bool = False):
-        state_device = self.observatory.state.get_device(self.id)
         try:
             self.observatory.state.add_action(f"Closing {self.alpaquero.name}")
             self.alpaca.CloseCover()
             
             status = self.alpaca.CoverState
-            state_device.cover_status = status
+            self.observatory.state.update_device(self.id, cover_status=status)
             
             if status == 1:  # 1 = Closed
                 self.observatory.state.remove_action(f"Closing {self.alpaquero.name}")
                 return
             elif status == 2:  # 2 = Moving
-                for _ in range(60):
-                    status = self.alpaca.CoverState
-                    state_device.cover_status = status
-                    if status == 1:
-                        self.observatory.state.remove_action(f"Closing {self.alpaquero.name}")
-                        return
-                    sleep(1)
+                if self.refresh_until(lambda d: d.cover_status == 1, timeout=60):
+                    self.observatory.state.remove_action(f"Closing {self.alpaquero.name}")
+                    return
                 self.observatory.state.remove_action(f"Closing {self.alpaquero.name}")
                 raise CoverError(code="cover_close_timeout", message=f"Closing cover {self.alpaquero.name} timed out")
             else:
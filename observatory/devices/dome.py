@@ -3,7 +3,6 @@ from observatory.action_registry import ActionRegistry
 from alpaquero.alpaquero import Alpaquero
 from alpaca import dome
 from observatory.errors import DomeError
-from time import sleep
 from typing import TYPE_CHECKING, Callable
 from observatory.safety import require_conditions
 from observatory.safety_conditions import weather_is_safe
@@ -12,21 +11,26 @@ if TYPE_CHECKING:
     from observatory.observatory import Observatory
 
 class AlpaqueroDome(ObservatoryDevice[dome.Dome]):
-    def __init__(self, observatory: "Observatory", factory: Callable[[], dome.Dome], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1):
+    def __init__(self, observatory: "Observatory", factory: Callable[[], dome.Dome], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1, **alpaquero_options):
         alpaquero = Alpaquero(
             factory,
             updater,
             poll_time=poll_time,
             name=name or id,
+            **alpaquero_options,
         )
         super().__init__(observatory, alpaquero, id=id, name=name)
 
+    def is_active(self) -> bool:
+        # 2 = opening, 3 = closing
+        return self.observatory.state.get_device(self.id).shutter_status in (2, 3)
+
     @ActionRegistry.register("open_dome", observatory_arg=False, action_type="device")
     @require_conditions(weather_is_safe)
     def open(self, override: bool = False):
-        state_device = self.observatory.state.get_device(self.id)
-        state_device.shutter_status = self.alpaca.ShutterStatus
-        if state_device.shutter_status == 0:
+        shutter_status = self.alpaca.ShutterStatus
+        self.observatory.state.update_device(self.id, shutter_status=shutter_status)
+        if shutter_status == 0:
             return
         self.observatory.state.add_action(f"Opening {self.alpaquero.name} dome")
 
@@ -36,23 +40,19 @@ class AlpaqueroDome(ObservatoryDevice[dome.Dome]):
             self.observatory.state.remove_action(f"Opening {self.alpaquero.name} dome")
             raise DomeError(f"Error opening dome {self.alpaquero.name}: {e}")
         
-        while True:
-            try:
-                status = self.alpaca.ShutterStatus
-                state_device.shutter_status = status
-                if status == 0:
-                    self.observatory.state.remove_action(f"Opening {self.alpaquero.name} dome")
-                    break
-                sleep(1)
-            except Exception as e:
-                self.observatory.state.remove_action(f"Opening {self.alpaquero.name} dome")
-                raise DomeError(f"Error monitoring dome {self.alpaquero.name} while opening: {e}")
+        # 4 = error
+        done = self.refresh_until(lambda d: d.shutter_status in (0, 4))
+        self.observatory.state.remove_action(f"Opening {self.alpaquero.name} dome")
+        if not done:
+            raise DomeError(f"Stopped monitoring dome {self.alpaquero.name} while opening")
+        if self.observatory.state.get_device(self.id).shutter_status == 4:
+            raise DomeError(f"Dome {self.alpaquero.name} reported an error while opening")
             
     @ActionRegistry.register("close_dome", observatory_arg=False, action_type="device")
     def close(self, override: bool = False):
-        state_device = self.observatory.state.get_device(self.id)
-        state_device.shutter_status = self.alpaca.ShutterStatus
-        if state_device.shutter_status == 1:
+        shutter_status = self.alpaca.ShutterStatus
+        self.observatory.state.update_device(self.id, shutter_status=shutter_status)
+        if shutter_status == 1:
             return
         self.observatory.state.add_action(f"Closing {self.alpaquero.name} dome")
 
@@ -62,17 +62,13 @@ class AlpaqueroDome(ObservatoryDevice[dome.Dome]):
             self.observatory.state.remove_action(f"Closing {self.alpaquero.name} dome")
             raise DomeError(f"Error closing dome {self.alpaquero.name}: {e}")
         
-        while True:
-            try:
-                status = self.alpaca.ShutterStatus
-                state_device.shutter_status = status
-                if status == 1:
-                    self.observatory.state.remove_action(f"Closing {self.alpaquero.name} dome")
-                    break
-                sleep(1)
-            except Exception as e:
-                self.observatory.state.remove_action(f"Closing {self.alpaquero.name} dome")
-                raise DomeError(f"Error monitoring dome {self.alpaquero.name} while closing: {e}")
+        # 4 = error
+        done = self.refresh_until(lambda d: d.shutter_status in (1, 4))
+        self.observatory.state.remove_action(f"Closing {self.alpaquero.name} dome")
+        if not done:
+            raise DomeError(f"Stopped monitoring dome {self.alpaquero.name} while closing")
+        if self.observatory.state.get_device(self.id).shutter_status == 4:
+            raise DomeError(f"Dome {self.alpaquero.name} reported an error while closing")
             
     async def trigger_open(self, override: bool = False):
         self.dispatch_trigger(self.open, override=override)
@@ -7,11 +7,12 @@ if TYPE_CHECKING:
     from observatory.observatory import Observatory
 
 class AlpaqueroSafetyMonitor(ObservatoryDevice[safetymonitor.SafetyMonitor]):
-    def __init__(self, observatory: "Observatory", factory: Callable[[], safetymonitor.SafetyMonitor], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1):
+    def __init__(self, observatory: "Observatory", factory: Callable[[], safetymonitor.SafetyMonitor], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1, **alpaquero_options):
         alpaquero = Alpaquero(
             factory,
             updater,
             poll_time=poll_time,
             name=name or id,
+            **alpaquero_options,
         )
         super().__init__(observatory, alpaquero, id=id, name=name)
@@ -2,7 +2,8 @@ from observatory.devices.base import ObservatoryDevice
 from alpaquero.alpaquero import Alpaquero
 from alpaca import switch
 from observatory.errors import SwitchError
-from observatory.state import RangeControl, ToggleControl
+from observatory.state import RangeControlRecord, ToggleControlRecord
+from alpaquero.factories.switch import SwitchControlRefresher
 from typing import TYPE_CHECKING, Callable
 
 from observatory.action_registry import ActionRegistry
@@ -11,29 +12,31 @@ if TYPE_CHECKING:
     from observatory.observatory import Observatory
 
 class AlpaqueroSwitch(ObservatoryDevice[switch.Switch]):
-    def __init__(self, observatory: "Observatory", factory: Callable[[], switch.Switch], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1):
+    def __init__(self, observatory: "Observatory", factory: Callable[[], switch.Switch], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1, **alpaquero_options):
         alpaquero = Alpaquero(
             factory,
             updater,
             poll_time=poll_time,
             name=name or id,
+            **alpaquero_options,
         )
         super().__init__(observatory, alpaquero, id=id, name=name)
+        self.control_refresher = SwitchControlRefresher(id, observatory.state, self.alpaquero.submit_background)
 
     @ActionRegistry.register("set_switch", observatory_arg=False, action_type="device")
     def set_switch(self, switch_number: int, value: float):
         try:
-            control = self._get_control(switch_number)
+            key, control = self._get_control(switch_number)
             switch_value = float(value)
-            if isinstance(control, RangeControl):
+            if isinstance(control, RangeControlRecord):
                 self.alpaca.SetSwitchValue(switch_number, int(switch_value))
-                control.value = switch_value
+                self.observatory.state.set_switch_values(self.id, {key: switch_value})
                 return
 
-            if isinstance(control, ToggleControl):
+            if isinstance(control, ToggleControlRecord):
                 switch_status = bool(switch_value)
                 self.alpaca.SetSwitch(switch_number, switch_status)
-                control.value = switch_status
+                self.observatory.state.set_switch_values(self.id, {key: switch_status})
                 return
 
             raise ValueError(f"Switch {switch_number} is not available in device state")
@@ -42,7 +45,7 @@ class AlpaqueroSwitch(ObservatoryDevice[switch.Switch]):
 
     def _get_control(self, switch_number: int):
         device = self.observatory.state.get_device(self.id)
-        for control in device.controls.values():
+        for key, control in device.controls.items():
             if control.id == switch_number:
-                return control
+                return key, control
         raise ValueError(f"Switch {switch_number} is not available in device state")
@@ -2,7 +2,6 @@ from observatory.devices.base import ObservatoryDevice
 from alpaquero.alpaquero import Alpaquero
 from alpaca import telescope
 from observatory.errors import TelescopeError
-from time import sleep
 from typing import TYPE_CHECKING, Callable
 from observatory.safety import require_conditions
 from observatory.safety_conditions import *
@@ -13,19 +12,22 @@ if TYPE_CHECKING:
     from observatory.observatory import Observatory
 
 class AlpaqueroTelescope(ObservatoryDevice[telescope.Telescope]):
-    def __init__(self, observatory: "Observatory", factory: Callable[[], telescope.Telescope], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1):
+    def __init__(self, observatory: "Observatory", factory: Callable[[], telescope.Telescope], updater: Callable[[], None], id: str, name: str = None, poll_time: float = 1, **alpaquero_options):
         alpaquero = Alpaquero(
             factory,
             updater,
             poll_time=poll_time,
             name=name or id,
+            **alpaquero_options,
         )
         super().__init__(observatory, alpaquero, id=id, name=name)
 
+    def is_active(self) -> bool:
+        return bool(self.observatory.state.get_device(self.id).slewing)
+
     @ActionRegistry.register("park_telescope", observatory_arg=False, action_type="device")
     @require_conditions(dome_is_open)
     def park(self, override: bool = False):
-        state_device = self.observatory.state.get_device(self.id)
         try:
             if self.alpaca.AtPark:
                 return
@@ -33,13 +35,9 @@ class AlpaqueroTelescope(ObservatoryDevice[telescope.Telescope]):
             self.observatory.state.add_action(f"Parking {self.alpaquero.name}")
             self.alpaca.Park()
             
-            for _ in range(60):
-                parked = self.alpaca.AtPark
-                state_device.parked = parked
-                if parked:
-                    self.observatory.state.remove_action(f"Parking {self.alpaquero.name}")
-                    return
-                sleep(1)
+            if self.refresh_until(lambda d: d.parked, timeout=60):
+                self.observatory.state.remove_action(f"Parking {self.alpaquero.name}")
+                return
             
             self.observatory.state.remove_action(f"Parking {self.alpaquero.name}")
             raise TelescopeError(code="telescope_park_timeout", message=f"Parking telescope {self.alpaquero.name} timed out")
@@ -50,7 +48,6 @@ class AlpaqueroTelescope(ObservatoryDevice[telescope.Telescope]):
     @ActionRegistry.register("unpark_telescope", observatory_arg=False, action_type="device")
     @require_conditions(weather_is_safe, dome_is_open)
     def unpark(self, override: bool = False):
-        state_device = self.observatory.state.get_device(self.id)
         try:
             if not self.alpaca.AtPark:
                 return
@@ -58,13 +55,9 @@ class AlpaqueroTelescope(ObservatoryDevice[telescope.Telescope]):
             self.observatory.state.add_action(f"Unparking {self.alpaquero.name}")
             self.alpaca.Unpark()
             
-            for _ in range(60):
-                parked = self.alpaca.AtPark
-                state_device.parked = parked
-                if not parked:
-                    self.observatory.state.remove_action(f"Unparking {self.alpaquero.name}")
-                    return
-                sleep(1)
+            if self.refresh_until(lambda d: not d.parked, timeout=60):
+                self.observatory.state.remove_action(f"Unparking {self.alpaquero.name}")
+                return
             
             self.observatory.state.remove_action(f"Unparking {self.alpaquero.name}")
             raise TelescopeError(code="telescope_unpark_timeout", message=f"Unparking telescope {self.alpaquero.name} timed out")
@@ -75,7 +68,6 @@ class AlpaqueroTelescope(ObservatoryDevice[telescope.Telescope]):
     @ActionRegistry.register("slew_telescope", observatory_arg=False, action_type="device")
     @require_conditions(weather_is_safe, dome_is_open)
     def slew(self, ra: float, dec: float, override: bool = False):
-        state_device = self.observatory.state.get_device(self.id)
         try:
             if self.alpaca.AtPark:
                 self.alpaca.Unpark()
@@ -87,13 +79,9 @@ class AlpaqueroTelescope(ObservatoryDevice[telescope.Telescope]):
             
             self.observatory.state.add_action(f"Slewing {self.alpaquero.name} to target")
             
-            for _ in range(60):
-                slewing = self.alpaca.Slewing
-                state_device.slewing = slewing
-                if not slewing:
-                    self.observatory.state.remove_action(f"Slewing {self.alpaquero.name} to target")
-                    return
-                sleep(1)
+            if self.refresh_until(lambda d: not d.slewing, timeout=60):
+                self.observatory.state.remove_action(f"Slewing {self.alpaquero.name} to target")
+                return
             
             self.observatory.state.remove_action(f"Slewing {self.alpaquero.name} to target")
             raise TelescopeError(code="telescope_slew_timeout", message=f"Slewing telescope {self.alpaquero.name} timed out")
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import json
+from typing import Any
+
+import msgpack
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+}
+
+_ACCEPTED = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+def negotiate(accept: str | None) -> str:
+    """The encoding to answer an ``Accept`` header with; JSON unless MessagePack is preferred."""
+    if not accept:
+        return JSON
+    best, best_quality = JSON, 0.0
+    for position, media_range in enumerate(accept.split(",")):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        encoding = _ACCEPTED.get(media_type.lower())
+        if encoding is None:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        # ties go to whichever the client listed first
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def encoding_from_name(name: str | None) -> str:
+    """Encoding chosen by a query parameter such as ``?encoding=msgpack``."""
+    if not name:
+        return JSON
+    name = name.lower()
+    if name in MEDIA_TYPES:
+        return name
+    raise ValueError(f"Unsupported encoding '{name}', expected one of: {', '.join(MEDIA_TYPES)}")
+
+
+def encode(data: Any, encoding: str) -> bytes:
+    if encoding == MSGPACK:
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def decode(payload: bytes | str, encoding: str) -> Any:
+    if encoding == MSGPACK and isinstance(payload, bytes):
+        return msgpack.unpackb(payload, raw=False)
+    return json.loads(payload)
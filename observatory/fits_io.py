@@ -0,0 +1,79 @@
+from __future__ import annotations
+import os
+
+import numpy as np
+import astropy.io.fits as fits
+
+# pixels converted to the on-disk representation per write
+CHUNK_BYTES = 4 << 20
+BLOCK = 2880
+
+
+def write_fits(filename: str | os.PathLike, data: np.ndarray, header: fits.Header, chunk_bytes: int = CHUNK_BYTES) -> int:
+    """Write ``data`` as a single primary HDU and return the file size.
+
+    astropy's ``writeto`` converts the whole image to big-endian and, for
+    unsigned integers, subtracts BZERO into another full-size copy first.
+    Here the header comes from astropy (BITPIX, NAXISn, BZERO/BSCALE) but the
+    pixels are converted ``chunk_bytes`` at a time, so the extra memory is one
+    chunk regardless of the frame size. ``data`` should already be in FITS
+    order ([plane][y][x]); anything that isn't C-contiguous is copied once.
+    """
+    hdu = fits.PrimaryHDU(data=data, header=header)
+    flat = np.ascontiguousarray(data).reshape(-1)
+    itemsize = flat.dtype.itemsize
+
+    # FITS has no unsigned types beyond bytes: uint16 is stored as int16 with
+    # BZERO=32768, i.e. with the sign bit flipped
+    offset = flat.dtype.kind == "u" and itemsize > 1
+    disk_dtype = np.dtype(f">u{itemsize}") if offset else flat.dtype.newbyteorder(">")
+    sign_bit = flat.dtype.type(1 << (8 * itemsize - 1)) if offset else None
+
+    per_chunk = max(1, chunk_bytes // itemsize)
+    buffer = np.empty(min(per_chunk, flat.size), dtype=disk_dtype)
+    with open(filename, "wb") as f:
+        f.write(hdu.header.tostring().encode("ascii"))
+        for start in range(0, flat.size, per_chunk):
+            part = flat[start:start + per_chunk]
+            out = buffer[:len(part)]
+            if offset:
+                np.bitwise_xor(part, sign_bit, out=out)
+            else:
+                out[...] = part
+            f.write(out.data)
+        data_size = flat.size * itemsize
+        if data_size % BLOCK:
+            f.write(bytes(BLOCK - data_size % BLOCK))
+        return f.tell()
+
+
+# compression option accepted from config and actions -> FITS tile compression
+COMPRESSION_TYPES = {
+    "rice": "RICE_1",
+    "gzip": "GZIP_1",
+}
+
+
+def compression_type(name: str | None) -> str | None:
+    """The tile compression algorithm for ``name``; None or "none" means uncompressed."""
+    if name is None or name.lower() == "none":
+        return None
+    try:
+        return COMPRESSION_TYPES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported FITS compression '{name}', expected one of: none, {', '.join(COMPRESSION_TYPES)}") from None
+
+
+def write_compressed_fits(filename: str | os.PathLike, data: np.ndarray, header: fits.Header, compression: str) -> int:
+    """Write ``data`` as a tile-compressed image extension and return the file size.
+
+    The layout is the one fpack produces (empty primary HDU, CompImageHDU),
+    readable by astropy, ds9 and funpack. Integer pixels are compressed
+    losslessly; Rice would quantize floating-point pixels, so those are
+    gzipped unquantized instead.
+    """
+    options = {"compression_type": compression}
+    if data.dtype.kind == "f":
+        options = {"compression_type": "GZIP_1", "quantize_level": 0}
+    fits.HDUList([fits.PrimaryHDU(), fits.CompImageHDU(data=data, header=header, **options)]).writeto(filename, overwrite=True)
+    return os.path.getsize(filename)
@@ -0,0 +1,219 @@
+from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+from multiprocessing import shared_memory
+import queue
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict
+
+import numpy as np
+import astropy.io.fits as fits
+
+from observatory.errors import CameraError
+from observatory.fits_io import write_compressed_fits, write_fits
+
+if TYPE_CHECKING:
+    from observatory.state import StateManager
+
+
+def _compress_shared(filename: str, name: str, shape: tuple[int, ...], dtype: str, hdr: fits.Header, compression: str) -> int:
+    """Pool side of ``FitsWriter.write``: compress a frame straight out of shared memory."""
+    frame = shared_memory.SharedMemory(name=name)
+    try:
+        return write_compressed_fits(filename, np.ndarray(shape, dtype=dtype, buffer=frame.buf), hdr, compression)
+    finally:
+        frame.close()
+
+
+class FitsWriter:
+    """Writes camera frames to disk on worker threads, off the exposure path.
+
+    ``submit`` queues a frame and returns a Future for its filename. Once
+    ``queue_size`` frames are waiting it blocks until a worker picks one up,
+    so a slow disk throttles the cameras instead of letting frames pile up
+    in memory. Each frame's outcome is published as the camera's
+    ``camera_capture:<id>`` status message.
+
+    Tile-compressed frames are encoded in a pool of ``compress_workers``
+    processes, so compression neither holds the API process's GIL nor is
+    limited to one core; the writer thread only waits on the result.
+
+    Once ``stop`` is called, ``submit`` raises CameraError until ``start``
+    is called again.
+    """
+
+    def __init__(self, state: "StateManager", workers: int = 2, queue_size: int = 4, compress_workers: int = 2):
+        self.state = state
+        self.workers = workers
+        self.queue_size = queue_size
+        self.compress_workers = compress_workers
+
+        self._queue: queue.Queue | None = None
+        self._threads: list[threading.Thread] = []
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        # stop() waits on this for submit() calls already putting a frame
+        self._submits_done = threading.Condition(self._lock)
+        self._submitting = 0
+        self._stopped = False
+
+        self._written = 0
+        self._failed = 0
+        self._bytes = 0
+        self._last_write_duration = 0.0
+        self._last_error: str | None = None
+
+    def start(self):
+        with self._lock:
+            self._stopped = False
+            self._start_workers()
+
+    def _start_workers(self) -> queue.Queue:
+        # caller holds self._lock
+        if not self._threads:
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._threads = [
+                threading.Thread(target=self._run, args=(self._queue,), name=f"fits-writer-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+        return self._queue
+
+    def stop(self, timeout: float | None = 60.0):
+        """Stop the workers once every frame queued so far is on disk."""
+        with self._lock:
+            self._stopped = True
+            # the workers are still running, so these puts do complete
+            self._submits_done.wait_for(lambda: self._submitting == 0)
+            threads, frames = self._threads, self._queue
+            self._threads, self._queue = [], None
+        for _ in threads:
+            frames.put(None)
+        for thread in threads:
+            thread.join(timeout)
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+    def _compression_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn rather than fork: the API process is full of threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.compress_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def write(self, filename: str, nda: np.ndarray, hdr: fits.Header, compression: str | None = None) -> int:
+        """Write one frame from the calling thread and return the file size.
+
+        ``compression`` is a FITS tile compression type (see
+        ``fits_io.compression_type``); those frames are encoded in the
+        process pool.
+        """
+        if compression is None:
+            return write_fits(filename, nda, hdr)
+        # one copy into shared memory instead of pickling the frame down a pipe
+        frame = shared_memory.SharedMemory(create=True, size=max(nda.nbytes, 1))
+        try:
+            np.ndarray(nda.shape, dtype=nda.dtype, buffer=frame.buf)[...] = nda
+            return self._compression_pool().submit(
+                _compress_shared, filename, frame.name, nda.shape, nda.dtype.str, hdr, compression,
+            ).result()
+        finally:
+            frame.close()
+            frame.unlink()
+
+    def submit(
+            self,
+            camera_id: str,
+            filename: str,
+            nda: np.ndarray,
+            hdr: fits.Header,
+            compression: str | None = None,
+            timeout: float | None = None,
+        ) -> "Future[str]":
+        """Queue ``nda`` to be written to ``filename``; blocks while the queue is full.
+
+        The writer owns ``nda`` and ``hdr`` from here on. Raises CameraError
+        if the writer is stopped or if ``timeout`` seconds pass without room
+        in the queue.
+        """
+        with self._lock:
+            if self._stopped:
+                raise CameraError(code="fits_writer_stopped", message=f"FITS writer is stopped, {filename} not saved")
+            frames = self._start_workers()
+            self._submitting += 1
+        future: "Future[str]" = Future()
+        try:
+            frames.put((camera_id, filename, nda, hdr, compression, future), timeout=timeout)
+        except queue.Full:
+            raise CameraError(code="fits_queue_full", message=f"FITS writer queue stayed full for {timeout}s, {filename} not saved") from None
+        finally:
+            with self._lock:
+                self._submitting -= 1
+                self._submits_done.notify_all()
+        return future
+
+    def join(self):
+        """Wait until every queued frame has been written or has failed."""
+        with self._lock:
+            frames = self._queue
+        if frames is not None:
+            frames.join()
+
+    def _run(self, frames: queue.Queue):
+        while True:
+            item = frames.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            finally:
+                frames.task_done()
+
+    def _write(
+            self,
+            camera_id: str,
+            filename: str,
+            nda: np.ndarray,
+            hdr: fits.Header,
+            compression: str | None,
+            future: "Future[str]",
+        ):
+        started = time.monotonic()
+        try:
+            size = self.write(filename, nda, hdr, compression)
+        except Exception as e:
+            with self._lock:
+                self._failed += 1
+                self._last_error = f"{filename}: {e}"
+            print(f"Error writing FITS file {filename}: {e}")
+            self.state.set_message(f"camera_capture:{camera_id}", f"Error saving image to {filename}: {e}")
+            future.set_exception(CameraError(code="fits_creation_failed", message=f"Error creating FITS file {filename}: {e}"))
+            return
+        with self._lock:
+            self._written += 1
+            self._bytes += size
+            self._last_write_duration = time.monotonic() - started
+        self.state.set_message(f"camera_capture:{camera_id}", f"Image captured and saved to {filename}")
+        future.set_result(filename)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            frames = self._queue
+            return {
+                "workers": len(self._threads),
+                "queued": frames.qsize() if frames is not None else 0,
+                "queue_size": self.queue_size,
+                "compress_workers": self.compress_workers if self._pool is not None else 0,
+                "written": self._written,
+                "failed": self._failed,
+                "bytes": self._bytes,
+                "last_write_duration": self._last_write_duration,
+                "last_error": self._last_error,
+            }
@@ -1,5 +1,5 @@
 import concurrent
-import asyncio, random, string
+import asyncio, random, string, threading
 from asyncio import TaskGroup
 from typing import Union
 from abc import ABC, abstractmethod
@@ -17,21 +17,34 @@ class ExecutionContext:
         self._gate = asyncio.Event()
         self._gate.set()
         self._abort = asyncio.Event()
+        # mirrors the gate for actions running in worker threads
+        self._resumed = threading.Event()
+        self._resumed.set()
         self.id = generate_context_id()
 
     def request_pause(self):
         self._gate.clear()
+        self._resumed.clear()
 
     def resume(self):
         self._gate.set()
+        self._resumed.set()
 
     def abort(self):
         self._abort.set()
         self._gate.set()
+        self._resumed.set()
 
     def gate_is_set(self):
         return self._gate.is_set()
 
+    def is_aborted(self):
+        return self._abort.is_set()
+
+    def wait_resumed(self, timeout: float | None = None) -> bool:
+        """Block a worker thread while the context is paused; also returns on abort."""
+        return self._resumed.wait(timeout)
+
     async def checkpoint(self):
         #print("checkpoint")
         if self._abort.is_set():
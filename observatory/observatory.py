@@ -35,7 +35,16 @@ from observatory.devices.telescope import AlpaqueroTelescope
 from alpaquero.factories.telescope import telescope_factory
 from alpaquero.updaters.telescope import telescope_updater
 
+from alpaquero.scheduler import AlpaqueroScheduler
+from alpaquero.batch import configure_read_pool
+from alpaquero.transport import AlpacaTransport
+from alpaquero.breaker import HostCircuitBreaker
+
 from observatory.state import StateManager
+from observatory.broadcast import StateBroadcastHub
+from observatory.telemetry import TelemetryStore
+from observatory.telemetry_archive import TelemetryArchive
+from observatory.fits_writer import FitsWriter
 from observatory.sequence_registry import SequenceRegistry
 
 from observatory.status import observatory_loop
@@ -57,15 +66,60 @@ class Observatory:
 
         self.sequence_registry = SequenceRegistry()
 
+        # shared polling engine, only created when config selects it
+        self.scheduler: AlpaqueroScheduler | None = None
+        # one pooled HTTP transport per Alpaca server, keyed by host:port
+        self.transports: Dict[str, AlpacaTransport] = {}
+
+        # auto-connect progress per device id: connecting, started or error
+        self.connect_phases: Dict[str, str] = {}
+        self._connect_tasks: Dict[str, asyncio.Task] = {}
+        self.startup_complete = False
+
         self.status = "initializing"
 
         # Init state
         self.state = StateManager()
+        # serialises each state version once for every /ws/state client
+        self.broadcast = StateBroadcastHub(self.state)
+        # recent numeric readings (weather, CCD temperature, mount position)
+        self.telemetry = TelemetryStore()
+        # camera frames are written to disk here while the next exposure runs
+        self.fits_writer = FitsWriter(self.state)
 
 
-    def startup(self):
+    async def startup(self):
         config = load_observatory_config()
         self.load_sequence_catalog()
+        self.broadcast.start()
+        telemetry_config = config.get("telemetry", {})
+        self.telemetry.capacity = telemetry_config.get("capacity", self.telemetry.capacity)
+        archive_config = telemetry_config.get("archive", {})
+        if archive_config.get("enabled", False):
+            self.telemetry.archive = TelemetryArchive(
+                archive_config.get("path", "data/telemetry"),
+                flush_interval=archive_config.get("flush_interval", 5.0),
+            )
+            self.telemetry.archive.start()
+        fits_writer_config = config.get("fits_writer", {})
+        self.fits_writer.workers = fits_writer_config.get("workers", self.fits_writer.workers)
+        self.fits_writer.queue_size = fits_writer_config.get("queue_size", self.fits_writer.queue_size)
+        self.fits_writer.compress_workers = fits_writer_config.get("compress_workers", self.fits_writer.compress_workers)
+        self.fits_writer.start()
+
+        polling = config.get("polling", {})
+        configure_read_pool(polling.get("read_workers", 16))
+        if polling.get("engine", "thread") == "async":
+            self.scheduler = AlpaqueroScheduler(
+                max_workers=polling.get("workers", 4),
+                connect_workers=polling.get("connect_workers", 2),
+            )
+            self.scheduler.start()
+
+        transport_config = config.get("transport", {})
+        startup_deadline = config.get("startup", {}).get("deadline", 15)
+        auto_connect_devices: List[Any] = []
+
         # Create all devices discovered in config
         for device in config.get("devices", []):
             print(device)
@@ -78,6 +132,15 @@ class Observatory:
             host = device.get("host")
             port = device.get("port")
             device_number = device.get("device_number")
+            transport = self.get_transport(f"{host}:{port}", transport_config)
+
+            alpaquero_options = {
+                "poll_time": poll_time,
+                "fast_poll_time": device.get("fast_poll_time"),
+                "idle_poll_time": device.get("idle_poll_time"),
+                "scheduler": self.scheduler,
+                "breaker": transport.breaker,
+            }
 
             self.configured_devices.append({
                 "type": device_type,
@@ -87,11 +150,12 @@ class Observatory:
             if device_type == "dome":
                 device_alpaquero = AlpaqueroDome(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: dome_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: dome_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: dome_updater(
                         dome=self.domes[did],
@@ -100,17 +164,18 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    **alpaquero_options,
                 )
                 self.domes[device_id] = device_alpaquero
             elif device_type == "telescope":
                 device_alpaquero = AlpaqueroTelescope(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: telescope_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: telescope_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: telescope_updater(
                         telescope=self.telescopes[did],
@@ -119,17 +184,18 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    **alpaquero_options,
                 )
                 self.telescopes[device_id] = device_alpaquero
             elif device_type == "camera":
                 device_alpaquero = AlpaqueroCamera(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: camera_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: camera_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: camera_updater(
                         camera=self.cameras[did],
@@ -138,17 +204,19 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    compression=device.get("compression"),
+                    **alpaquero_options,
                 )
                 self.cameras[device_id] = device_alpaquero
             elif device_type == "observing_conditions":
                 device_alpaquero = AlpaqueroObservingConditions(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: observing_conditions_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: observing_conditions_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: observing_conditions_updater(
                         observing_conditions=self.observing_conditions[did],
@@ -157,17 +225,18 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    **alpaquero_options,
                 )
                 self.observing_conditions[device_id] = device_alpaquero
             elif device_type == "safety_monitor":
                 device_alpaquero = AlpaqueroSafetyMonitor(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: safety_monitor_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: safety_monitor_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: safety_monitor_updater(
                         safety_monitor=self.safety_monitors[did],
@@ -176,17 +245,18 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    **alpaquero_options,
                 )
                 self.safety_monitors[device_id] = device_alpaquero
             elif device_type == "cover":
                 device_alpaquero = AlpaqueroCover(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: cover_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: cover_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: cover_updater(
                         cover=self.covers[did],
@@ -195,17 +265,18 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    **alpaquero_options,
                 )
                 self.covers[device_id] = device_alpaquero
             elif device_type == "filterwheel":
                 device_alpaquero = AlpaqueroFilterWheel(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: filterwheel_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: filterwheel_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: filterwheel_updater(
                         filterwheel=self.filterwheels[did],
@@ -214,17 +285,18 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    **alpaquero_options,
                 )
                 self.filterwheels[device_id] = device_alpaquero
             elif device_type == "switch":
                 device_alpaquero = AlpaqueroSwitch(
                     observatory=self,
-                    factory=lambda h=host, p=port, did=device_id, dn=device_number: switch_factory(
+                    factory=lambda h=host, p=port, did=device_id, dn=device_number, tr=transport: switch_factory(
                         address=f"{h}:{p}",
                         id=did,
                         device_number=dn,
-                        state=self.state
+                        state=self.state,
+                        transport=tr,
                     ),
                     updater=lambda did=device_id: switch_updater(
                         switch_device=self.switches[did],
@@ -233,7 +305,7 @@ class Observatory:
                     ),
                     id=device_id,
                     name=name,
-                    poll_time=poll_time,
+                    **alpaquero_options,
                 )
                 self.switches[device_id] = device_alpaquero
             else:
@@ -241,11 +313,119 @@ class Observatory:
 
             
             if auto_connect:
-                print("="*40, "reached auto connect for", device_type, name)
-                device_alpaquero.connect()
+                auto_connect_devices.append(device_alpaquero)
+
+        await self.connect_devices(auto_connect_devices, startup_deadline)
+        self.startup_complete = True
+
         # Start observatory loops
         asyncio.create_task(observatory_loop(self.state, self))
 
+    async def connect_devices(self, devices: List[Any], deadline: float) -> None:
+        """Connect devices concurrently, waiting at most ``deadline`` seconds.
+
+        A device counts as started once its polling loop has completed a first
+        step with the device connected; factories and first polls block on
+        the driver, so each runs in a worker thread. Devices that miss the
+        deadline keep connecting in the background and show up in readiness()
+        once they finish.
+        """
+        for device in devices:
+            print("="*40, "reached auto connect for", device.id, device.name)
+            self.connect_phases[device.id] = "connecting"
+            task = asyncio.create_task(self._start_device(device))
+            task.add_done_callback(lambda t, did=device.id: self._connect_done(did, t))
+            self._connect_tasks[device.id] = task
+
+        if not self._connect_tasks:
+            return
+        _, pending = await asyncio.wait(self._connect_tasks.values(), timeout=deadline)
+        if pending:
+            late = [did for did, task in self._connect_tasks.items() if task in pending]
+            print(f"Startup deadline of {deadline}s passed, still connecting in background: {', '.join(late)}")
+
+    async def _start_device(self, device: Any) -> bool:
+        after = device.alpaquero.steps()
+        await asyncio.to_thread(device.connect)
+        # connect() returns once polling is started, even when the factory
+        # failed, so wait for the first step to see whether the device answers
+        await asyncio.to_thread(device.alpaquero.wait_for_update, after)
+        return self._device_connected(device.id)
+
+    def _connect_done(self, device_id: str, task: "asyncio.Task") -> None:
+        if task.cancelled():
+            self.connect_phases[device_id] = "error"
+            return
+        error = task.exception()
+        if error is not None:
+            print(f"Error connecting {device_id} at startup: {error}")
+            self.connect_phases[device_id] = "error"
+        elif task.result():
+            # the device's polling loop owns the connection from here on
+            self.connect_phases[device_id] = "started"
+        else:
+            print(f"{device_id} did not come up at startup, retrying in the background")
+            self.connect_phases[device_id] = "error"
+
+    def _device_connected(self, device_id: str) -> bool:
+        try:
+            return self.state.get_device(device_id).connected
+        except ValueError:
+            return False
+
+    def readiness(self) -> Dict[str, Any]:
+        devices: Dict[str, Any] = {}
+        for configured in self.configured_devices:
+            device_id = configured["id"]
+            connected = self._device_connected(device_id)
+            if connected and self.connect_phases.get(device_id) == "error":
+                # missed startup but came up while retrying in the background
+                self.connect_phases[device_id] = "started"
+            devices[device_id] = {
+                "auto_connect": device_id in self.connect_phases,
+                "phase": self.connect_phases.get(device_id, "manual"),
+                "connected": connected,
+            }
+        pending = [
+            device_id for device_id in self.connect_phases
+            if not devices.get(device_id, {}).get("connected")
+        ]
+        return {
+            "ready": self.startup_complete and not pending,
+            "startup_complete": self.startup_complete,
+            "pending": pending,
+            "devices": devices,
+        }
+
+    def get_transport(self, address: str, transport_config: Dict[str, Any]) -> AlpacaTransport:
+        transport = self.transports.get(address)
+        if transport is None:
+            breaker_config = transport_config.get("breaker", {})
+            transport = AlpacaTransport(
+                address,
+                pool_size=transport_config.get("pool_size", 8),
+                connect_timeout=transport_config.get("connect_timeout", 2.0),
+                read_timeout=transport_config.get("read_timeout", 5.0),
+                breaker=HostCircuitBreaker(
+                    address,
+                    failure_threshold=breaker_config.get("failure_threshold", 5),
+                    reset_timeout=breaker_config.get("reset_timeout", 2.0),
+                    max_reset_timeout=breaker_config.get("max_reset_timeout", 10.0),
+                ),
+            )
+            self.transports[address] = transport
+        return transport
+
+    def shutdown(self):
+        self.broadcast.stop()
+        self.fits_writer.stop()
+        if self.telemetry.archive is not None:
+            self.telemetry.archive.stop()
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        for transport in self.transports.values():
+            transport.close()
+
     def load_sequence_catalog(self, catalog_dir: Path | None = None) -> None:
         from observatory.sequence_parser import SequenceParser
 
@@ -305,10 +485,17 @@ class Observatory:
                 print(f"Error aborting slew for dome {dome.name} during emergency halt: {e}")
 
     def get_device(self, device_id: str):
-        for device_dict in [self.domes, self.telescopes, self.cameras, self.observing_conditions, self.safety_monitors, self.covers, self.filterwheels, self.switches]:
+        for device_dict in self._device_dicts():
             if device_id in device_dict:
                 return device_dict[device_id]
         raise ValueError(f"Device with id {device_id} not found")
+
+    def iter_devices(self):
+        for device_dict in self._device_dicts():
+            yield from device_dict.values()
+
+    def _device_dicts(self):
+        return [self.domes, self.telescopes, self.cameras, self.observing_conditions, self.safety_monitors, self.covers, self.filterwheels, self.switches]
     
     @ActionRegistry.register("set_status", observatory_arg=True, action_type="observatory")
     def set_status(self, status: str):
@@ -75,6 +75,9 @@ class SequenceParser(SequenceBuilder):
             if "observatory" in original_signature.parameters:
                 print("Adding observatory to accepted args for action:", action_name)
                 accepted_args["observatory"] = self.observatory
+            if "context" in original_signature.parameters:
+                # long-running actions check it for pause and abort
+                accepted_args["context"] = context
 
             if action_type == "device":
                 device_id = data.get("device") or args.get("device")
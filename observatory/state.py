@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
+import asyncio
+from contextlib import contextmanager
 import threading
 import time
-from typing import Annotated, Dict, Literal, Optional, Union
+import uuid
+from typing import TYPE_CHECKING, Annotated, Dict, Iterable, Iterator, Literal, Optional, Union
+
+from observatory.encoding import JSON, encode
+from observatory.state_records import Record, to_record
+
+if TYPE_CHECKING:
+    from alpaquero.capabilities import DeviceCapabilities
 
 
 class ObservatoryStatus(BaseModel):
@@ -122,87 +131,419 @@ class Snapshot(BaseModel):
     devices: Dict[str, DeviceState] = Field(default_factory=dict)
     sequences: Dict[str, SequenceState] = Field(default_factory=dict)
 
+
+# internal records mirroring the models above; the store keeps these and the
+# models are only built when a snapshot is served
+class StatusRecord(Record, model=ObservatoryStatus):
+    __slots__ = ()
+
+class SequenceRecord(Record, model=SequenceState):
+    __slots__ = ()
+
+class DomeRecord(Record, model=DomeState):
+    __slots__ = ()
+
+class TelescopeRecord(Record, model=TelescopeState):
+    __slots__ = ()
+
+class ObservingConditionsRecord(Record, model=ObservingConditionsState):
+    __slots__ = ()
+
+class SafetyMonitorRecord(Record, model=SafetyMonitorState):
+    __slots__ = ()
+
+class CoverRecord(Record, model=CoverState):
+    __slots__ = ()
+
+class ToggleControlRecord(Record, model=ToggleControl):
+    __slots__ = ()
+
+class RangeControlRecord(Record, model=RangeControl):
+    __slots__ = ()
+
+SwitchControlRecord = Union[ToggleControlRecord, RangeControlRecord]
+
+class SwitchRecord(Record, model=SwitchState):
+    __slots__ = ()
+
+class CameraRecord(Record, model=CameraState):
+    __slots__ = ()
+
+class FilterwheelRecord(Record, model=FilterwheelState):
+    __slots__ = ()
+
+DeviceRecord = Union[DomeRecord, TelescopeRecord, ObservingConditionsRecord, SafetyMonitorRecord, CoverRecord, SwitchRecord, CameraRecord, FilterwheelRecord]
+
+class StoreRecord(Record, model=Snapshot):
+    __slots__ = ()
+
+# change keys: "*" matches everything, "devices" any device, "device:<id>" one
+# device and "device:<id>.<field>" one field of it
+ANY_KEY = "*"
+DEVICES_KEY = "devices"
+STATUS_KEY = "status"
+SEQUENCES_KEY = "sequences"
+
+
+def device_key(device_id: str, field: str | None = None) -> str:
+    return f"device:{device_id}" if field is None else f"device:{device_id}.{field}"
+
+
+class StateSubscription:
+    """Tracks the last version a consumer has seen for a set of change keys."""
+
+    def __init__(self, state: "StateManager", keys: Iterable[str]):
+        self._state = state
+        self.keys = frozenset(keys)
+        self.version = state.version
+
+    def wait(self, timeout: float | None = None) -> bool:
+        version = self._state.wait_for_change(self.keys, self.version, timeout)
+        if version is None:
+            return False
+        self.version = version
+        return True
+
+    async def wait_async(self, timeout: float | None = None) -> bool:
+        version = await self._state.wait_for_change_async(self.keys, self.version, timeout)
+        if version is None:
+            return False
+        self.version = version
+        return True
+
+
+def _device_keys(device: DeviceRecord, fields: Iterable[str] | None = None) -> list[str]:
+    """Change keys touched by a device write; all of its fields when ``fields`` is None."""
+    if fields is None:
+        fields = device._fields
+    return [DEVICES_KEY, device_key(device.id), *(device_key(device.id, field) for field in fields)]
+
+
+def _reuse_models(records: Dict[str, Record], previous: Dict[str, Record], models: Dict[str, BaseModel]) -> Dict[str, BaseModel]:
+    if records is previous:
+        return models
+    return {
+        key: models[key] if previous.get(key) is record else record.to_model()
+        for key, record in records.items()
+    }
+
+
+def _resolve_waiter(future: asyncio.Future, version: int) -> None:
+    if not future.done():
+        future.set_result(version)
+
+
 class StateManager:
+    """Observatory state published as immutable, versioned snapshots.
+
+    Writers serialise on a lock and publish a new store record that shares
+    every unchanged subtree with the previous one. Readers take the current
+    records without locking or copying, so whatever they get back (devices,
+    controls, sequences) must be treated as read-only. Writes that change
+    nothing do not publish a new version.
+
+    The pydantic Snapshot is only built when asked for, at most once per
+    version, and reuses the models of records that did not change since the
+    previous one.
+    """
+
     def __init__(self):
+        # writers to one device serialise on its own lock; the global lock is
+        # only held to swap in the next snapshot
         self._lock = threading.Lock()
-        self._snapshot = Snapshot()
-
-    def add_device(self, device: DeviceState):
+        self._device_locks: Dict[str, threading.Lock] = {}
+        self._device_locks_guard = threading.Lock()
+        # (version, store), swapped as a single reference on publish
+        self._published: tuple[int, StoreRecord] = (0, StoreRecord(status=StatusRecord()))
+        # (version, store, model) of the last exported Snapshot
+        self._exported: tuple[int, StoreRecord | None, Snapshot | None] = (-1, None, None)
+        self._export_lock = threading.Lock()
+        # encoding -> (version, body) of the last serialised snapshot
+        self._encoded: Dict[str, tuple[int, bytes]] = {}
+        # versions restart at 0 with the process; this tells two runs apart
+        self.instance_id = uuid.uuid4().hex[:12]
+        # version at which each change key last changed
+        self._key_versions: Dict[str, int] = {}
+        self._changed = threading.Condition(self._lock)
+        self._async_waiters: list[tuple[frozenset[str], asyncio.AbstractEventLoop, asyncio.Future]] = []
+        # connect-time capability profiles, kept beside (not inside) the snapshot
+        self._capabilities: Dict[str, "DeviceCapabilities"] = {}
+
+    @property
+    def version(self) -> int:
+        return self._published[0]
+
+    def _current(self) -> StoreRecord:
+        return self._published[1]
+
+    def _publish(self, snapshot: StoreRecord, keys: Iterable[str]) -> None:
+        # caller holds self._lock
+        version = self._published[0] + 1
+        self._published = (version, snapshot)
+        keys = set(keys)
+        for key in keys:
+            self._key_versions[key] = version
+        self._changed.notify_all()
+
+        keys.add(ANY_KEY)
+        remaining = []
+        for waiter in self._async_waiters:
+            waiter_keys, loop, future = waiter
+            if waiter_keys.isdisjoint(keys):
+                remaining.append(waiter)
+                continue
+            try:
+                loop.call_soon_threadsafe(_resolve_waiter, future, version)
+            except RuntimeError:
+                # loop already closed
+                pass
+        self._async_waiters = remaining
+
+    def _changed_since(self, keys: frozenset[str], version: int) -> bool:
+        if ANY_KEY in keys:
+            return self._published[0] > version
+        return any(self._key_versions.get(key, 0) > version for key in keys)
+
+    def subscribe(self, *keys: str) -> StateSubscription:
+        return StateSubscription(self, keys or (ANY_KEY,))
+
+    def wait_for_change(self, keys: Iterable[str], since: int, timeout: float | None = None) -> int | None:
+        """Block until any of ``keys`` changes after version ``since``.
+
+        Returns the current version, or None on timeout.
+        """
+        keys = frozenset(keys)
+        with self._changed:
+            if self._changed.wait_for(lambda: self._changed_since(keys, since), timeout):
+                return self._published[0]
+            return None
+
+    async def wait_for_change_async(self, keys: Iterable[str], since: int, timeout: float | None = None) -> int | None:
+        """Await a change to any of ``keys`` after version ``since`` without blocking the loop."""
+        keys = frozenset(keys)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._changed_since(keys, since):
+                return self._published[0]
+            future = loop.create_future()
+            waiter = (keys, loop, future)
+            self._async_waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._lock:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+
+    def _device_lock(self, device_id: str) -> threading.Lock:
+        with self._device_locks_guard:
+            lock = self._device_locks.get(device_id)
+            if lock is None:
+                lock = self._device_locks[device_id] = threading.Lock()
+            return lock
+
+    def _commit_device(self, device: DeviceRecord, fields: Iterable[str] | None = None) -> None:
+        # caller holds the device's lock; the global lock only covers the swap
         with self._lock:
-            existing_device = self._snapshot.devices.get(device.id)
+            snapshot = self._current()
+            self._publish(
+                snapshot.replace({"devices": {**snapshot.devices, device.id: device}}),
+                _device_keys(device, fields),
+            )
+
+    def _replace_status(self, **fields) -> None:
+        snapshot = self._current()
+        status = snapshot.status.replace(fields)
+        self._publish(snapshot.replace({"status": status}), (STATUS_KEY,))
+
+    def _replace_sequences(self, sequences: Dict[str, SequenceRecord]) -> None:
+        self._publish(self._current().replace({"sequences": sequences}), (SEQUENCES_KEY,))
+
+    def add_device(self, device: DeviceState | DeviceRecord):
+        if not isinstance(device, Record):
+            device = to_record(device)
+        with self._device_lock(device.id):
+            existing_device = self._current().devices.get(device.id)
             if existing_device is not None and existing_device.connected:
                 raise ValueError(f"Device with id {device.id} already exists.")
-            self._snapshot.devices[device.id] = device
+            self._commit_device(device)
 
     def remove_device(self, device_id: str):
+        with self._device_lock(device_id):
+            device = self.get_device(device_id)
+            with self._lock:
+                snapshot = self._current()
+                devices = {key: value for key, value in snapshot.devices.items() if key != device_id}
+                self._publish(snapshot.replace({"devices": devices}), _device_keys(device))
+
+    def get_device(self, device_id: str) -> DeviceRecord:
+        try:
+            return self._current().devices[device_id]
+        except KeyError:
+            raise ValueError(f"Device with id {device_id} does not exist.")
+
+    def update_device(self, device_id: str, **fields) -> None:
+        """Commit new values for several fields of one device as a single version."""
+        with self._device_lock(device_id):
+            device = self.get_device(device_id)
+            changed = device.changes(fields)
+            if changed:
+                self._commit_device(device.replace(changed), changed)
+
+    @contextmanager
+    def edit_device(self, device_id: str) -> Iterator[DeviceRecord]:
+        """Read-modify-write one device atomically.
+
+        Yields a private, settable draft of the device; whatever it holds when
+        the block exits is committed in one swap. Other writers to the same device wait, writers
+        to other devices do not. Nothing is committed if the block raises.
+        """
+        with self._device_lock(device_id):
+            device = self.get_device(device_id)
+            draft = device.draft()
+            yield draft
+            record = draft.freeze()
+            changed = record.changed_fields(device)
+            if changed:
+                self._commit_device(record, changed)
+
+    def set_switch_values(self, device_id: str, values: Dict[str, Union[bool, float]]) -> None:
+        with self._device_lock(device_id):
+            device = self.get_device(device_id)
+            controls = dict(device.controls)
+            changed = False
+            for key, value in values.items():
+                control = controls.get(key)
+                if control is not None and control.value != value:
+                    controls[key] = control.replace({"value": value})
+                    changed = True
+            if changed:
+                self._commit_device(device.replace({"controls": controls}), ("controls",))
+
+    def set_capabilities(self, device_id: str, capabilities: "DeviceCapabilities") -> None:
         with self._lock:
-            if device_id not in self._snapshot.devices:
-                raise ValueError(f"Device with id {device_id} does not exist.")
-            self._snapshot.devices.pop(device_id, None)
-        
-    def get_device(self, device_id: str) -> DeviceState:
+            self._capabilities[device_id] = capabilities
+
+    def get_capabilities(self, device_id: str) -> "DeviceCapabilities | None":
         with self._lock:
-            try:
-                return self._snapshot.devices[device_id]
-            except KeyError:
-                raise ValueError(f"Device with id {device_id} does not exist.")
+            return self._capabilities.get(device_id)
 
     def set_device_connected(self, device_id: str, connected: bool) -> None:
-        with self._lock:
-            try:
-                self._snapshot.devices[device_id].connected = connected
-            except KeyError:
-                raise ValueError(f"Device with id {device_id} does not exist.")
-            
+        self.update_device(device_id, connected=connected)
+
     def add_action(self, text: str):
         with self._lock:
-            self._snapshot.status.actions.append(text)
+            self._replace_status(actions=[*self._current().status.actions, text])
 
     def remove_action(self, text: str) -> None:
         with self._lock:
+            actions = list(self._current().status.actions)
             try:
-                self._snapshot.status.actions.remove(text)
+                actions.remove(text)
             except ValueError:
-                pass
+                return
+            self._replace_status(actions=actions)
 
     def add_sequence(self, context_id: str, sequence_name: str):
         with self._lock:
-            self._snapshot.sequences[context_id] = SequenceState(
-                context_id=context_id,
-                sequence_name=sequence_name,
-            )
+            sequence = SequenceRecord(context_id=context_id, sequence_name=sequence_name)
+            self._replace_sequences({**self._current().sequences, context_id: sequence})
 
     def remove_sequence(self, context_id: str):
         with self._lock:
-            self._snapshot.sequences.pop(context_id, None)
+            sequences = self._current().sequences
+            if context_id in sequences:
+                self._replace_sequences({key: seq for key, seq in sequences.items() if key != context_id})
 
     def set_sequence_status(self, context_id: str, status: str):
         with self._lock:
+            sequences = self._current().sequences
             try:
-                self._snapshot.sequences[context_id].status = status
+                sequence = sequences[context_id]
             except KeyError:
                 raise ValueError(f"Sequence with context_id {context_id} does not exist.")
+            if sequence.status != status:
+                self._replace_sequences({**sequences, context_id: sequence.replace({"status": status})})
 
     def set_message(self, msg_id: str, text: str) -> None:
         with self._lock:
-            self._snapshot.status.messages[msg_id] = text
+            messages = self._current().status.messages
+            if messages.get(msg_id) != text:
+                self._replace_status(messages={**messages, msg_id: text})
 
     def clear_message(self, msg_id: str) -> None:
         with self._lock:
-            self._snapshot.status.messages.pop(msg_id, None)
+            messages = self._current().status.messages
+            if msg_id in messages:
+                self._replace_status(messages={key: text for key, text in messages.items() if key != msg_id})
 
     def set_status(self, status: GlobalStatus["status"]) -> None:  # type: ignore[index]
         with self._lock:
-            self._snapshot.status.status = status
+            if self._current().status.status != status:
+                self._replace_status(status=status)
+
+    def _export(self, version: int, store: StoreRecord) -> Snapshot:
+        with self._export_lock:
+            exported_version, exported_store, exported = self._exported
+            if exported_version == version:
+                return exported
+
+            if exported is None:
+                status = store.status.to_model()
+                devices = {key: device.to_model() for key, device in store.devices.items()}
+                sequences = {key: sequence.to_model() for key, sequence in store.sequences.items()}
+            else:
+                # unchanged records keep their model, so consecutive snapshots
+                # still share unchanged subtrees by identity
+                status = exported.status if store.status is exported_store.status else store.status.to_model()
+                devices = _reuse_models(store.devices, exported_store.devices, exported.devices)
+                sequences = _reuse_models(store.sequences, exported_store.sequences, exported.sequences)
+
+            snapshot = Snapshot.model_construct(
+                schema_version=store.schema_version,
+                status=status,
+                devices=devices,
+                sequences=sequences,
+            )
+            if version > exported_version:
+                self._exported = (version, store, snapshot)
+            return snapshot
 
     def snapshot(self) -> Snapshot:
-        with self._lock:
-            return self._snapshot.model_copy(deep=True)
-        
+        """The current snapshot, shared with other readers; do not mutate it."""
+        return self._export(*self._published)
+
+    def versioned_snapshot(self) -> tuple[int, Snapshot]:
+        version, store = self._published
+        return version, self._export(version, store)
+
+    def versioned_body(self, encoding: str = JSON) -> tuple[int, bytes]:
+        """The current version and its encoded snapshot, serialised once per version and encoding."""
+        version, store = self._published
+        cached = self._encoded.get(encoding, (-1, b""))
+        if cached[0] == version:
+            return cached
+        snapshot = self._export(version, store)
+        if encoding == JSON:
+            body = snapshot.model_dump_json().encode()
+        else:
+            body = encode(snapshot.model_dump(), encoding)
+        if version > self._encoded.get(encoding, (-1, b""))[0]:
+            self._encoded[encoding] = (version, body)
+        return version, body
+
+    def versioned_json(self) -> tuple[int, bytes]:
+        return self.versioned_body(JSON)
+
+    def etag(self, version: int, encoding: str = JSON) -> str:
+        if encoding == JSON:
+            return f'"{self.instance_id}-{version}"'
+        return f'"{self.instance_id}-{version}-{encoding}"'
+
     def snapshot_json(self) -> str:
-        with self._lock:
-            return self._snapshot.model_dump_json()
-        
+        return self.versioned_json()[1].decode()
+
     def snapshot_dict(self) -> dict:
-        with self._lock:
-            return self._snapshot.model_dump()
+        return self.snapshot().model_dump()
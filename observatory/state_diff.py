@@ -0,0 +1,48 @@
+from __future__ import annotations
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return to_jsonable_python(value)
+
+
+def diff_snapshots(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """RFC 6902 operations turning ``old`` into ``new``.
+
+    Snapshots are copy-on-write, so unchanged subtrees are the same objects
+    and are skipped by identity without being walked. Models and dicts are
+    diffed key by key; lists and scalars are replaced whole.
+    """
+    if old is new:
+        return []
+
+    if isinstance(old, BaseModel) and type(old) is type(new):
+        ops: list[dict[str, Any]] = []
+        for name in type(old).model_fields:
+            ops.extend(diff_snapshots(getattr(old, name), getattr(new, name), f"{path}/{_escape(name)}"))
+        return ops
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old.keys() - new.keys():
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": _jsonable(value)})
+            else:
+                ops.extend(diff_snapshots(old[key], value, child))
+        return ops
+
+    if old == new:
+        return []
+    return [{"op": "replace", "path": path, "value": _jsonable(new)}]
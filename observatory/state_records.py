@@ -0,0 +1,188 @@
+from __future__ import annotations
+from typing import Any, Callable, ClassVar
+
+from pydantic import BaseModel
+
+
+# pydantic model -> record class mirroring it
+_RECORDS: dict[type[BaseModel], type["Record"]] = {}
+
+
+def _field_property(index: int, writable: bool = False) -> property:
+    def get(self):
+        return self._values[index]
+
+    def set(self, value):
+        self._values[index] = value
+
+    def read_only(self, value):
+        raise AttributeError(
+            f"{type(self).__name__} is a published snapshot; use replace() or a StateManager write"
+        )
+
+    return property(get, set if writable else read_only)
+
+
+class Record:
+    """Compact, list-backed mirror of a pydantic state model.
+
+    Subclasses name their model (``class CameraRecord(Record,
+    model=CameraState)``) and get one attribute per model field, in the same
+    order and with the same defaults, stored in a single list. Records are
+    what the state store keeps and hands to device code; the pydantic model is
+    only built by ``to_model`` when a response is served. Records are not
+    validated, so anything coming from outside should go through the model
+    first (``to_record(Model(...))``).
+
+    Records are shared by every reader of a snapshot, so their fields are
+    read-only: changes go through ``replace()`` or, for a read-modify-write,
+    the settable ``draft()`` that ``StateManager.edit_device`` hands out.
+    """
+
+    __slots__ = ("_values",)
+
+    _model: ClassVar[type[BaseModel]]
+    _fields: ClassVar[tuple[str, ...]] = ()
+    _index: ClassVar[dict[str, int]] = {}
+    _defaults: ClassVar[tuple[Any, ...]] = ()
+    _factories: ClassVar[tuple[tuple[int, Callable[[], Any]], ...]] = ()
+    _required: ClassVar[frozenset[str]] = frozenset()
+    # the read-only record class, and its settable twin used by draft()
+    _record_class: ClassVar[type["Record"]]
+    _draft_class: ClassVar[type["Record"]]
+
+    def __init_subclass__(cls, model: type[BaseModel] | None = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if model is None:
+            return
+        cls._model = model
+        cls._fields = tuple(model.model_fields)
+        cls._index = {name: index for index, name in enumerate(cls._fields)}
+        defaults, factories, required = [], [], set()
+        for index, (name, info) in enumerate(model.model_fields.items()):
+            if hasattr(Record, name):
+                raise TypeError(f"{model.__name__}.{name} clashes with a Record attribute")
+            if info.default_factory is not None:
+                factories.append((index, info.default_factory))
+                defaults.append(None)
+            elif info.is_required():
+                required.add(name)
+                defaults.append(None)
+            else:
+                defaults.append(info.default)
+            setattr(cls, name, _field_property(index))
+        cls._defaults = tuple(defaults)
+        cls._factories = tuple(factories)
+        cls._required = frozenset(required)
+        cls._record_class = cls
+        cls._draft_class = type(f"{cls.__name__}Draft", (cls,), {
+            "__slots__": (),
+            **{name: _field_property(index, writable=True) for index, name in enumerate(cls._fields)},
+        })
+        _RECORDS[model] = cls
+
+    def __init__(self, **values):
+        missing = self._required - values.keys()
+        if missing:
+            raise TypeError(f"{type(self).__name__} missing fields: {', '.join(sorted(missing))}")
+        record = list(self._defaults)
+        for index, factory in self._factories:
+            record[index] = factory()
+        index = self._index
+        for name, value in values.items():
+            try:
+                record[index[name]] = value
+            except KeyError:
+                raise TypeError(f"{type(self).__name__} has no field {name!r}") from None
+        self._values = record
+
+    @classmethod
+    def _from_values(cls, values: list[Any]):
+        record = object.__new__(cls)
+        record._values = values
+        return record
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values == other._values
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self._fields, self._values))
+        return f"{type(self).__name__}({fields})"
+
+    def changes(self, fields: dict[str, Any]) -> dict[str, Any]:
+        """The subset of ``fields`` whose values differ from this record's."""
+        index = self._index
+        values = self._values
+        changed = {}
+        for name, value in fields.items():
+            try:
+                position = index[name]
+            except KeyError:
+                raise ValueError(f'"{self._model.__name__}" object has no field "{name}"') from None
+            if values[position] != value:
+                changed[name] = value
+        return changed
+
+    def replace(self, changes: dict[str, Any]):
+        """A new record with ``changes`` applied; this one is left untouched."""
+        values = self._values.copy()
+        index = self._index
+        for name, value in changes.items():
+            values[index[name]] = value
+        return self._from_values(values)
+
+    def copy(self, deep: bool = False):
+        if not deep:
+            return self._from_values(self._values.copy())
+        return self._from_values([_copy_value(value) for value in self._values])
+
+    def draft(self):
+        """A settable deep copy of this record; ``freeze()`` turns it back into a record."""
+        return self._draft_class._from_values([_copy_value(value) for value in self._values])
+
+    def freeze(self):
+        return self._record_class._from_values(self._values)
+
+    def changed_fields(self, other: "Record") -> list[str]:
+        return [name for name, old, new in zip(self._fields, other._values, self._values) if old != new]
+
+    def to_model(self) -> BaseModel:
+        return self._model.model_construct(**{
+            name: _export(value) for name, value in zip(self._fields, self._values)
+        })
+
+
+def _copy_value(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.copy(deep=True)
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_value(item) for item in value]
+    return value
+
+
+def _export(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.to_model()
+    if isinstance(value, dict):
+        return {key: _export(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_export(item) for item in value]
+    return value
+
+
+def to_record(value: Any) -> Any:
+    """Convert a validated pydantic model (and any models nested in it) to records."""
+    if isinstance(value, BaseModel):
+        cls = _RECORDS[type(value)]
+        return cls._from_values([to_record(getattr(value, name)) for name in cls._fields])
+    if isinstance(value, dict):
+        return {key: to_record(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_record(item) for item in value]
+    return value
@@ -0,0 +1,184 @@
+from __future__ import annotations
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from observatory.telemetry_archive import TelemetryArchive
+
+
+class TelemetryRing:
+    """Fixed-size ring of (timestamp, value) samples for one numeric field.
+
+    Timestamps are Unix seconds and are expected to arrive in order, so the
+    two halves of the ring are each sorted and a time window is found with a
+    binary search on each half rather than a scan.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: float):
+        with self._lock:
+            self._times[self._head] = timestamp
+            self._values[self._head] = value
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def window(self, start: float | None = None, end: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Copies of the samples with ``start <= t <= end``, oldest first."""
+        with self._lock:
+            if self._count < self.capacity:
+                parts = [slice(0, self._count)]
+            else:
+                parts = [slice(self._head, self.capacity), slice(0, self._head)]
+            times, values = [], []
+            for part in parts:
+                part_times = self._times[part]
+                lo = 0 if start is None else np.searchsorted(part_times, start, "left")
+                hi = len(part_times) if end is None else np.searchsorted(part_times, end, "right")
+                times.append(part_times[lo:hi])
+                values.append(self._values[part][lo:hi])
+            return np.concatenate(times), np.concatenate(values)
+
+    def span(self) -> tuple[float, float] | None:
+        with self._lock:
+            if not self._count:
+                return None
+            oldest = 0 if self._count < self.capacity else self._head
+            return float(self._times[oldest]), float(self._times[self._head - 1])
+
+
+def bucket_stats(times: np.ndarray, values: np.ndarray, edges: np.ndarray):
+    """Min, max, sum and count of ``values`` per bucket starting at each of ``edges``.
+
+    ``times`` must be sorted and lie within the buckets. Only filled buckets
+    are reported, as (bucket indices, mins, maxs, sums, counts).
+    """
+    first = np.searchsorted(times, edges, "left")
+    counts = np.diff(np.append(first, len(times)))
+    filled = np.flatnonzero(counts > 0)
+    offsets = first[filled]
+    return (
+        filled,
+        np.minimum.reduceat(values, offsets),
+        np.maximum.reduceat(values, offsets),
+        np.add.reduceat(values, offsets),
+        counts[filled],
+    )
+
+
+def bucket_edges(start: float, end: float, buckets: int) -> np.ndarray:
+    width = (end - start) / buckets if end > start else 1.0
+    return start + width * np.arange(buckets)
+
+
+def format_buckets(edges: np.ndarray, filled: np.ndarray, mins, maxs, sums, counts) -> Dict[str, list]:
+    return {
+        "t": edges[filled].tolist(),
+        "min": np.asarray(mins).tolist(),
+        "max": np.asarray(maxs).tolist(),
+        "mean": (np.asarray(sums) / counts).tolist(),
+        "count": np.asarray(counts).tolist(),
+    }
+
+
+def downsample(times: np.ndarray, values: np.ndarray, start: float, end: float, buckets: int) -> Dict[str, list]:
+    """Min/max/mean of ``values`` in ``buckets`` equal-width time buckets over [start, end].
+
+    Empty buckets are left out. ``t`` is each bucket's start time.
+    """
+    edges = bucket_edges(start, end, buckets)
+    return format_buckets(edges, *bucket_stats(times, values, edges))
+
+
+class TelemetryStore:
+    """In-memory history of numeric device fields, one ring per (device, field).
+
+    Updaters call ``record`` every tick with the values they just read;
+    rings are created on first use with ``capacity`` samples each. When an
+    ``archive`` is set the same samples are queued for it as well.
+    """
+
+    def __init__(self, capacity: int = 43200, archive: "TelemetryArchive | None" = None):
+        self.capacity = capacity
+        self.archive = archive
+        self._rings: Dict[str, Dict[str, TelemetryRing]] = {}
+        self._lock = threading.Lock()
+
+    def _ring(self, device_id: str, field: str) -> TelemetryRing:
+        with self._lock:
+            fields = self._rings.setdefault(device_id, {})
+            ring = fields.get(field)
+            if ring is None:
+                ring = fields[field] = TelemetryRing(self.capacity)
+            return ring
+
+    def record(self, device_id: str, values: Dict[str, Any], timestamp: float | None = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        # bools are ints too, but not something to average
+        numeric = {
+            field: value for field, value in values.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+        for field, value in numeric.items():
+            self._ring(device_id, field).append(timestamp, value)
+        if self.archive is not None and numeric:
+            self.archive.append(device_id, timestamp, numeric)
+
+    def fields(self, device_id: str) -> list[str]:
+        with self._lock:
+            return list(self._rings.get(device_id, {}))
+
+    def has_device(self, device_id: str) -> bool:
+        with self._lock:
+            return device_id in self._rings
+
+    def history(
+            self,
+            device_id: str,
+            fields: Iterable[str] | None = None,
+            start: float | None = None,
+            end: float | None = None,
+            buckets: int = 200,
+        ) -> Dict[str, Any]:
+        """Downsampled history of ``fields`` (all recorded ones by default) over [start, end].
+
+        ``start`` defaults to the oldest sample of the requested fields and
+        ``end`` to now.
+        """
+        with self._lock:
+            rings = dict(self._rings.get(device_id, {}))
+        if fields is not None:
+            fields = list(fields)
+            unknown = [field for field in fields if field not in rings]
+            if unknown:
+                raise ValueError(f"No telemetry for {device_id} field(s): {', '.join(unknown)}")
+            rings = {field: rings[field] for field in fields}
+
+        end = time.time() if end is None else end
+        if start is None:
+            spans = [span for span in (ring.span() for ring in rings.values()) if span is not None]
+            start = min((span[0] for span in spans), default=end)
+
+        result = {}
+        for field, ring in rings.items():
+            times, values = ring.window(start, end)
+            result[field] = downsample(times, values, start, end, buckets)
+        return {
+            "device_id": device_id,
+            "start": start,
+            "end": end,
+            "bucket_width": (end - start) / buckets if end > start else 0.0,
+            "fields": result,
+        }
@@ -0,0 +1,197 @@
+from __future__ import annotations
+from collections import deque
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+from observatory.telemetry import bucket_edges, bucket_stats, format_buckets
+
+# one fixed-width record per sample: Unix time and value, little-endian
+SAMPLE_DTYPE = np.dtype([("t", "<f8"), ("v", "<f8")])
+SEGMENT_SUFFIX = ".f8"
+DAY = 86400
+
+
+def _day_name(day: int) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(day * DAY))
+
+
+def _safe_name(name: str) -> str:
+    return name.replace(os.sep, "_").replace("..", "_")
+
+
+class TelemetryArchive:
+    """Append-only on-disk telemetry, one columnar segment per field per UTC day.
+
+    Samples land in ``<root>/<YYYY-MM-DD>/<device>/<field>.f8`` as packed
+    (t, v) float64 pairs. ``append`` only queues; a background thread writes
+    the queue every ``flush_interval`` seconds, one write and one fsync per
+    touched segment, so disk latency never reaches the updater threads.
+    Reads memory-map the segments and only touch the pages in the requested
+    range.
+    """
+
+    def __init__(self, root: str | Path, flush_interval: float = 5.0, max_pending: int = 1_000_000):
+        self.root = Path(root)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        self._pending: deque[tuple[str, float, Dict[str, float]]] = deque()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._written = 0
+        self._dropped = 0
+        self._flushes = 0
+        self._last_flush_duration = 0.0
+        self._last_error: str | None = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-archive", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the writer after a final flush of everything queued so far."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def append(self, device_id: str, timestamp: float, values: Dict[str, float]):
+        # a deque append is atomic, so updater threads never take a lock here
+        if len(self._pending) >= self.max_pending:
+            self._dropped += len(values)
+            return
+        self._pending.append((device_id, timestamp, values))
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            started = time.monotonic()
+            batches: Dict[tuple[int, str, str], list[tuple[float, float]]] = {}
+            while self._pending:
+                device_id, timestamp, values = self._pending.popleft()
+                day = int(timestamp // DAY)
+                for field, value in values.items():
+                    batches.setdefault((day, device_id, field), []).append((timestamp, value))
+            if not batches:
+                return
+
+            for (day, device_id, field), samples in batches.items():
+                path = self._segment_path(day, device_id, field)
+                try:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(path, "ab") as f:
+                        f.write(np.array(samples, dtype=SAMPLE_DTYPE).tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+                    self._written += len(samples)
+                except OSError as e:
+                    self._dropped += len(samples)
+                    self._last_error = str(e)
+                    print(f"Error writing telemetry archive {path}: {e}")
+            self._flushes += 1
+            self._last_flush_duration = time.monotonic() - started
+
+    def _segment_path(self, day: int, device_id: str, field: str) -> Path:
+        return self.root / _day_name(day) / _safe_name(device_id) / f"{_safe_name(field)}{SEGMENT_SUFFIX}"
+
+    def _segments(self, device_id: str, field: str, start: float, end: float) -> list[Path]:
+        paths = []
+        for day in range(int(start // DAY), int(end // DAY) + 1):
+            path = self._segment_path(day, device_id, field)
+            if path.exists():
+                paths.append(path)
+        return paths
+
+    @staticmethod
+    def _map(path: Path, start: float, end: float) -> np.ndarray:
+        """Memory-mapped view of one segment's samples with ``start <= t <= end``."""
+        # a write in progress may have left a partial record at the end
+        count = path.stat().st_size // SAMPLE_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=SAMPLE_DTYPE)
+        samples = np.memmap(path, dtype=SAMPLE_DTYPE, mode="r", shape=(count,))
+        times = samples["t"]
+        return samples[np.searchsorted(times, start, "left"):np.searchsorted(times, end, "right")]
+
+    def fields(self, device_id: str, start: float, end: float) -> list[str]:
+        fields: set[str] = set()
+        for day in range(int(start // DAY), int(end // DAY) + 1):
+            directory = self.root / _day_name(day) / _safe_name(device_id)
+            if directory.is_dir():
+                fields.update(path.stem for path in directory.glob(f"*{SEGMENT_SUFFIX}"))
+        return sorted(fields)
+
+    def read(self, device_id: str, field: str, start: float, end: float) -> tuple[np.ndarray, np.ndarray]:
+        """Raw samples in [start, end], copied out of the mapped segments."""
+        parts = [self._map(path, start, end) for path in self._segments(device_id, field, start, end)]
+        if not parts:
+            return np.empty(0), np.empty(0)
+        return np.concatenate([part["t"] for part in parts]), np.concatenate([part["v"] for part in parts])
+
+    def history(
+            self,
+            device_id: str,
+            fields: Iterable[str] | None = None,
+            start: float | None = None,
+            end: float | None = None,
+            buckets: int = 200,
+        ) -> Dict[str, Any]:
+        """Min/max/mean buckets over [start, end], in the shape of TelemetryStore.history.
+
+        Each day's segment is reduced on its own mapping and the partial
+        buckets merged, so only the bucket arrays are held in memory.
+        """
+        end = time.time() if end is None else end
+        start = end - DAY if start is None else start
+        fields = self.fields(device_id, start, end) if fields is None else list(fields)
+        edges = bucket_edges(start, end, buckets)
+
+        result = {}
+        for field in fields:
+            mins = np.full(buckets, np.inf)
+            maxs = np.full(buckets, -np.inf)
+            sums = np.zeros(buckets)
+            counts = np.zeros(buckets, dtype=np.int64)
+            for path in self._segments(device_id, field, start, end):
+                samples = self._map(path, start, end)
+                filled, seg_mins, seg_maxs, seg_sums, seg_counts = bucket_stats(samples["t"], samples["v"], edges)
+                mins[filled] = np.minimum(mins[filled], seg_mins)
+                maxs[filled] = np.maximum(maxs[filled], seg_maxs)
+                sums[filled] += seg_sums
+                counts[filled] += seg_counts
+            filled = np.flatnonzero(counts)
+            result[field] = format_buckets(edges, filled, mins[filled], maxs[filled], sums[filled], counts[filled])
+        return {
+            "device_id": device_id,
+            "start": start,
+            "end": end,
+            "bucket_width": (end - start) / buckets if end > start else 0.0,
+            "fields": result,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "root": str(self.root),
+            "pending": len(self._pending),
+            "written": self._written,
+            "dropped": self._dropped,
+            "flushes": self._flushes,
+            "last_flush_duration": self._last_flush_duration,
+            "last_error": self._last_error,
+        }
@@ -1,6 +1,8 @@
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from fastapi import Request, WebSocket
+from fastapi import Request, Response, WebSocket
+from observatory.encoding import MEDIA_TYPES, encode, negotiate
 from observatory.observatory import Observatory
 from observatory.safety import reset_current_observatory, set_current_observatory
 
@@ -20,4 +22,10 @@ async def get_observatory_ws(websocket: WebSocket) -> AsyncGenerator[Observatory
     try:
         yield observatory
     finally:
-        reset_current_observatory(token)
\ No newline at end of file
+        reset_current_observatory(token)
+
+
+def encoded_response(request: Request, data: Any) -> Response:
+    """``data`` as JSON or MessagePack, whichever the request's Accept header prefers."""
+    encoding = negotiate(request.headers.get("accept"))
+    return Response(encode(data, encoding), media_type=MEDIA_TYPES[encoding], headers={"Vary": "Accept"})
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from observatory.observatory import Observatory
@@ -11,6 +13,8 @@ class CameraExposureRequest(BaseModel):
     binX: int = 1
     binY: int = 1
     additional_headers: dict = {}
+    # "rice", "gzip" or "none"; the camera's configured default when omitted
+    compression: Optional[str] = None
 
 @router.post("/{camera_id}/startup")
 async def camera_startup(
@@ -56,7 +60,8 @@ async def capture_image(
             body.base_path,
             body.binX,
             body.binY,
-            body.additional_headers
+            body.additional_headers,
+            body.compression,
         )
         return {"message": f"Capture started for camera {camera_id}"}
     except Exception as e:
@@ -1,10 +1,12 @@
+import asyncio
 from typing import Any, Dict, Optional
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Body
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Body, Request, Response
 from observatory.sequence_parser import SequenceParser
 from observatory.action_registry import ActionRegistry
 from observatory.observatory import Observatory
 from pydantic import BaseModel, ConfigDict, Field
-from routes import get_observatory
+from observatory.encoding import MEDIA_TYPES, negotiate
+from routes import encoded_response, get_observatory
 
 class StartSequenceRequest(BaseModel):
     params: Dict[str, Any] = Field(default_factory=dict)
@@ -94,9 +96,110 @@ async def upload_sequence(
 
 @router.get("/devices")
 async def list_devices(observatory: Observatory = Depends(get_observatory)):
-    # in future, also expose device capabilities
-    return observatory.configured_devices
+    devices = []
+    for device in observatory.configured_devices:
+        capabilities = observatory.state.get_capabilities(device["id"])
+        devices.append({**device, "capabilities": capabilities.to_dict() if capabilities else None})
+    return devices
+
+@router.get("/transports")
+async def list_transports(observatory: Observatory = Depends(get_observatory)):
+    return {"transports": [transport.stats() for transport in observatory.transports.values()]}
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # If-None-Match uses weak comparison
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
 
 @router.get("/state")
-async def get_state(observatory: Observatory = Depends(get_observatory)):
-    return observatory.state.snapshot()
+async def get_state(request: Request, observatory: Observatory = Depends(get_observatory)):
+    """Full state snapshot with an ETag of the state version; answers If-None-Match with 304.
+
+    Sent as MessagePack instead of JSON when the Accept header prefers it.
+    """
+    encoding = negotiate(request.headers.get("accept"))
+    version, body = observatory.state.versioned_body(encoding)
+    etag = observatory.state.etag(version, encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=MEDIA_TYPES[encoding], headers=headers)
+
+@router.get("/history/{device_id}")
+async def get_history(
+    request: Request,
+    device_id: str,
+    fields: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    buckets: int = 200,
+    observatory: Observatory = Depends(get_observatory),
+):
+    """Min/max/mean of recorded numeric fields in ``buckets`` time buckets.
+
+    ``fields`` is comma separated (all recorded fields by default); ``start``
+    and ``end`` are Unix timestamps.
+    """
+    if not 1 <= buckets <= 10000:
+        raise HTTPException(status_code=400, detail="buckets must be between 1 and 10000")
+    if not observatory.telemetry.has_device(device_id):
+        raise HTTPException(status_code=404, detail=f"No telemetry recorded for device '{device_id}'.")
+    try:
+        history = observatory.telemetry.history(
+            device_id,
+            fields.split(",") if fields else None,
+            start,
+            end,
+            buckets,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return encoded_response(request, history)
+
+@router.get("/archive/{device_id}")
+async def get_archive(
+    request: Request,
+    device_id: str,
+    fields: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    buckets: int = 200,
+    observatory: Observatory = Depends(get_observatory),
+):
+    """Like /history but read from the on-disk archive; defaults to the last 24 hours."""
+    archive = observatory.telemetry.archive
+    if archive is None:
+        raise HTTPException(status_code=404, detail="Telemetry archive is not enabled.")
+    if not 1 <= buckets <= 10000:
+        raise HTTPException(status_code=400, detail="buckets must be between 1 and 10000")
+    history = await asyncio.to_thread(
+        archive.history,
+        device_id,
+        fields.split(",") if fields else None,
+        start,
+        end,
+        buckets,
+    )
+    return encoded_response(request, history)
+
+@router.get("/ready")
+async def get_readiness(observatory: Observatory = Depends(get_observatory)):
+    return observatory.readiness()
+
+@router.get("/metrics")
+async def get_metrics(observatory: Observatory = Depends(get_observatory)):
+    return {
+        "devices": {device.id: device.alpaquero.metrics_snapshot() for device in observatory.iter_devices()},
+        "broadcast": observatory.broadcast.stats(),
+        "telemetry_archive": observatory.telemetry.archive.stats() if observatory.telemetry.archive else None,
+        "fits_writer": observatory.fits_writer.stats(),
+    }
+
+@router.get("/health")
+async def get_health(observatory: Observatory = Depends(get_observatory)):
+    return {"devices": {device.id: device.alpaquero.health() for device in observatory.iter_devices()}}
@@ -1,18 +1,58 @@
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
 import asyncio
-from observatory.observatory import Observatory 
+from observatory.encoding import decode, encoding_from_name
+from observatory.observatory import Observatory
 from routes import get_observatory_ws
 
 router = APIRouter()
 
 @router.websocket("/ws/state")
-async def state_websocket(websocket: WebSocket, observatory: Observatory = Depends(get_observatory_ws)):
+async def state_websocket(websocket: WebSocket, mode: str = "snapshot", encoding: str = "json", observatory: Observatory = Depends(get_observatory_ws)):
+    """State stream fed by the shared broadcast hub.
+
+    ``mode=snapshot`` (default) pushes the full state on every change.
+    ``mode=delta`` sends one snapshot and then JSON-patch messages with
+    ``seq``/``version``/``base_version``; on a gap or a failed patch the
+    client sends ``{"type": "resync"}`` and gets a fresh snapshot.
+    ``encoding=msgpack`` sends the same messages as binary MessagePack
+    frames; requests may then be sent as JSON text or MessagePack.
+    """
     await websocket.accept()
+    try:
+        wire_encoding = encoding_from_name(encoding)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    client = observatory.broadcast.subscribe(delta=mode == "delta", encoding=wire_encoding)
+
+    async def receive():
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            payload = frame["text"] if frame.get("text") is not None else frame.get("bytes")
+            message = decode(payload, wire_encoding)
+            if isinstance(message, dict) and message.get("type") == "resync":
+                client.resync()
+
+    receiver = asyncio.create_task(receive())
     try:
         while True:
-            await websocket.send_json(observatory.state.snapshot_dict())
-            await asyncio.sleep(1)
+            outgoing = asyncio.create_task(client.get())
+            done, _ = await asyncio.wait({outgoing, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                outgoing.cancel()
+                receiver.result()
+                return
+            message = outgoing.result()
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
     except WebSocketDisconnect:
         pass
     except Exception as e:
-        await websocket.close(code=1011, reason=str(e))
\ No newline at end of file
+        await websocket.close(code=1011, reason=str(e))
+    finally:
+        receiver.cancel()
+        observatory.broadcast.unsubscribe(client)
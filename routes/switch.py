@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Depends
 from observatory.observatory import Observatory
-from observatory.state import SwitchState
+from observatory.state import SwitchRecord
 from routes import get_observatory
 
 router = APIRouter(prefix="/switch", tags=["switch"])
@@ -35,12 +35,12 @@ async def get_switch_controls(
     except ValueError:
         raise HTTPException(status_code=404, detail=f"Switch {switch_id} not found")
 
-    if not isinstance(device, SwitchState):
+    if not isinstance(device, SwitchRecord):
         raise HTTPException(status_code=404, detail=f"Switch {switch_id} not found")
 
     controls = []
     for key, control in sorted(device.controls.items(), key=lambda item: item[1].id):
-        control_info = control.model_dump()
+        control_info = control.to_model().model_dump()
         control_info["key"] = key
         controls.append(control_info)
 